@@ -1,6 +1,7 @@
-import json, matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+import json, os, math, itertools
+from collections import deque
+import numpy as np
+import pandas as pd
 
 
 # =====================================================
@@ -8,7 +9,7 @@ import matplotlib.pyplot as plt
 # =====================================================
 class Backtester:
     def __init__(self, df, file_config="config/config.json"):
-        self.df = df.copy()
+        self.df = df.copy(deep=False)      # new columns only (data may be a view of a shared panel)
         self.load_config(file_config)
         
     def load_config(self, path):
@@ -64,10 +65,113 @@ class Backtester:
             raise RuntimeError(f"Error in backtest run_strategy: {err}") from err
         return df
 
+    def run_batch(self, predictions, grid=None):
+        """
+        Runs the backtest of many strategies at once on NumPy arrays:
+        predictions is a matrix (strategies x samples) of predicted closes
+        aligned with self.df, and grid optionally lists hysteresis,
+        persistence and volume_ma values to sweep (default from config).
+        Returns one row of summary metrics per strategy and parameter set.
+        """
+        try:
+            grid  = grid or {}
+            P     = np.atleast_2d(np.asarray(predictions, dtype=float))
+            close = self.df["Close"].to_numpy(dtype=float)
+            vol   = self.df["Volume"].to_numpy(dtype=float)
+            S, T  = P.shape
+            idx   = np.arange(T)
+            
+            # asset percentage variation (zero during training samples)
+            ret = np.zeros(T)
+            ret[1:] = close[1:]/close[:-1] -1
+            ret[:self.N] = 0.0
+            cum_market = np.cumprod(1 +ret)
+            
+            rows = []
+            for hysteresis, persistence in itertools.product(grid.get("hysteresis", [self.hysteresis]), grid.get("persistence", [self.persistence])):
+                # generate buy/sell signals
+                raw = np.where(P > (1 +hysteresis/100)*close, 1, 0)
+                raw = np.where(P < (1 -hysteresis/100)*close, -1, raw)
+                
+                # consecutive samples of same signal (signal length), zero while there is no signal
+                start = np.ones((S, T), dtype=bool)
+                start[:, 1:] = raw[:, 1:] != raw[:, :-1]
+                length = idx -np.maximum.accumulate(np.where(start, idx, 0), axis=1) +1
+                length[raw == 0] = 0
+                signal = np.where(length < persistence, 0, raw)
+                
+                # simulate execution (position using previous sample)
+                position = np.full((S, T), np.nan)
+                position[:, 1:] = signal[:, :-1]
+                trade = np.full((S, T), np.nan)
+                trade[:, 1:] = np.abs(np.diff(position, axis=1))
+                strategy = position*ret
+                strategy[np.isnan(strategy)] = 0.00001
+                
+                # cumulative return and drawdown
+                cum_strategy = np.cumprod(1 +strategy, axis=1)
+                peak = np.maximum.accumulate(cum_strategy, axis=1)
+                drawdown = (cum_strategy -peak)/peak
+                
+                # last entry price (close at last trade of size one)
+                entry = np.where(trade == 1, idx, -1).max(axis=1)
+                entry_price = np.where(entry >= 0, close[np.maximum(entry, 0)], np.nan)
+                
+                metrics = {
+                    "Return_Market": np.full(S, cum_market[-1]),
+                    "Return_Strategy": cum_strategy[:, -1],
+                    "Trades": np.nansum(trade, axis=1)//2,
+                    "Sharpe": strategy.mean(axis=1)/strategy.std(axis=1, ddof=1)*pow(T, 0.5),
+                    "Max_Drawdown": np.abs(drawdown.min(axis=1)),
+                    "Signal": signal[:, -1],
+                    "Signal_Length": length[:, -1],
+                    "Entry_Price": entry_price,
+                }
+                for volume_ma in grid.get("volume_ma", [self.volume_ma]):
+                    # confirmation signal (last sample)
+                    volume_mean = vol[-volume_ma:].mean() if T >= volume_ma else np.nan
+                    rows.append(pd.DataFrame({
+                        "Strategy": np.arange(S),
+                        "Hysteresis": hysteresis,
+                        "Persistence": persistence,
+                        "Volume_MA": volume_ma,
+                        **metrics,
+                        "Volume_Strength": (vol[-1] -volume_mean)/volume_mean,
+                    }))
+        
+        except KeyError as err:
+            raise KeyError(f"Required column missing in backtest: {err}")
+        except Exception as err:
+            raise RuntimeError(f"Error in backtest run_batch: {err}") from err
+        return pd.concat(rows, ignore_index=True)
+
+    def init_state(self, **meta):
+        # empty incremental backtest state (same parameters as run_strategy)
+        return BacktestState(self.N, self.hysteresis, self.persistence, self.volume_ma, **meta)
+    
+    def load_state(self, path, **meta):
+        # saved state when still valid for current data, parameters and model (else empty state)
+        if os.path.exists(path):
+            state = BacktestState.load(path)
+            if (state.N, state.hysteresis, state.persistence, state.volume_ma) == (self.N, self.hysteresis, self.persistence, self.volume_ma) and state.matches(self.df, **meta):
+                return state
+        return self.init_state(**meta)
+    
+    def run_state(self, path, **meta):
+        # incremental backtest: updates saved state only with new samples
+        state = self.load_state(path, **meta)
+        state.update_frame(self.df.iloc[state.n:])
+        state.save(path)
+        return state
+
     def plot_res(self, label):
+        # plotting backend imported only when charts are rendered
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
         ticker, ind_t, *params = label.split("_")
 
-        df = self.df.iloc[self.N:].copy()
+        df = self.df.iloc[self.N:]
         
         # save results       
         plt.figure(figsize=(12,6))
@@ -86,4 +190,169 @@ class Backtester:
         plt.legend()
         plt.grid(True)
         plt.savefig(f"data/results/{label}_backtest.png", dpi=300, bbox_inches="tight")
-        plt.close()
\ No newline at end of file
+        plt.close()
+
+
+# =====================================================
+#  Backtest State (incremental backtest)
+# =====================================================
+class BacktestState:
+    FIELDS = ["n", "date", "close", "raw", "run", "signal_length", "signal", "position", "entry_price", "volumes",
+              "volume_strength", "trades", "cum_market", "cum_strategy", "peak", "max_drawdown", "mean", "m2"]
+    
+    def __init__(self, N, hysteresis, persistence, volume_ma, **meta):
+        self.N, self.hysteresis, self.persistence, self.volume_ma = N, hysteresis, persistence, volume_ma
+        self.meta = meta                # identifies model and data the state belongs to
+        self.n = 0                      # number of samples
+        self.date = None
+        self.close = math.nan
+        self.raw = None                 # last signal before persistence filter
+        self.run = 0                    # consecutive samples of same raw signal
+        self.signal_length = 0
+        self.signal = math.nan
+        self.position = math.nan
+        self.entry_price = math.nan
+        self.volumes = deque(maxlen=volume_ma)
+        self.volume_strength = math.nan
+        self.trades = 0.0
+        self.cum_market = 1.0
+        self.cum_strategy = 1.0
+        self.peak = -math.inf
+        self.max_drawdown = 0.0
+        self.mean = 0.0                 # running mean and sum of squares of strategy returns (Welford)
+        self.m2 = 0.0
+        
+    def update(self, date, close, volume, predicted):
+        # asset percentage variation (zero during training samples)
+        ret = close/self.close -1 if self.n >= self.N else 0.0
+        
+        # buy/sell signals and persistence filter
+        raw = 0
+        if predicted > (1 +self.hysteresis/100)*close:
+            raw = 1
+        elif predicted < (1 -self.hysteresis/100)*close:
+            raw = -1
+        self.run = self.run +1 if raw == self.raw else 1
+        self.raw = raw
+        self.signal_length = self.run if raw != 0 else 0
+        
+        # position from previous signal, trade and entry price
+        position = self.signal
+        trade = abs(position -self.position)
+        if trade == 1:
+            self.entry_price = close
+        if not math.isnan(trade):
+            self.trades += trade
+        self.position = position
+        self.signal = 0 if self.signal_length < self.persistence else raw
+        
+        # returns and drawdown
+        strategy = position*ret
+        if math.isnan(strategy):
+            strategy = 0.00001
+        self.cum_market *= 1 +ret
+        self.cum_strategy *= 1 +strategy
+        self.peak = max(self.peak, self.cum_strategy)
+        self.max_drawdown = min(self.max_drawdown, (self.cum_strategy -self.peak)/self.peak)
+        self.n += 1
+        delta = strategy -self.mean
+        self.mean += delta/self.n
+        self.m2 += delta*(strategy -self.mean)
+        
+        # confirmation signal
+        self.volumes.append(volume)
+        volume_ma = sum(self.volumes)/self.volume_ma if len(self.volumes) == self.volume_ma else math.nan
+        self.volume_strength = (volume -volume_ma)/volume_ma
+        self.date, self.close = date, close
+        return self
+    
+    def update_frame(self, df):
+        # append samples (Close, Volume and Predicted_Close columns)
+        for date, close, volume, predicted in zip(df.index, df["Close"], df["Volume"], df["Predicted_Close"]):
+            self.update(date, float(close), float(volume), float(predicted))
+        return self
+    
+    def metrics(self):
+        std = math.sqrt(self.m2/(self.n -1)) if self.n > 1 else math.nan
+        return {
+            "Return_Market": self.cum_market,
+            "Return_Strategy": self.cum_strategy,
+            "Trades": self.trades//2,
+            "Sharpe": self.mean/std*pow(self.n, 0.5),
+            "Max_Drawdown": abs(self.max_drawdown),
+        }
+    
+    def matches(self, df, **meta):
+        # state is valid for data containing its last sample at same position (and same model)
+        if self.meta != meta or self.date is None or self.date not in df.index:
+            return False
+        k = df.index.get_loc(self.date)
+        return k == self.n -1 and math.isclose(float(df["Close"].iloc[k]), self.close)
+        
+    def save(self, path):
+        state = {f: getattr(self, f) for f in self.FIELDS}
+        state["date"] = None if self.date is None else str(self.date)
+        state["volumes"] = list(self.volumes)
+        state = {f: None if isinstance(v, float) and not math.isfinite(v) else v for f, v in state.items()}
+        state.update(N=self.N, hysteresis=self.hysteresis, persistence=self.persistence, volume_ma=self.volume_ma, meta=self.meta)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+            
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self = cls(state["N"], state["hysteresis"], state["persistence"], state["volume_ma"], **state["meta"])
+        for f in cls.FIELDS:
+            setattr(self, f, math.nan if state[f] is None and f not in ("raw", "date") else state[f])
+        self.peak = -math.inf if state["peak"] is None else state["peak"]
+        self.date = None if state["date"] is None else pd.Timestamp(state["date"])
+        self.volumes = deque(state["volumes"], maxlen=self.volume_ma)
+        return self
+
+
+# =====================================================
+#  Result (compact metrics of a strategy)
+# =====================================================
+class Result:
+    __slots__ = ["Indicator", "Parameters", "Return_Market", "Return_Strategy", "Trades", "Sharpe", "Max_Drawdown", "Score"]
+    
+    def __init__(self, **metrics):
+        for key in self.__slots__:
+            setattr(self, key, metrics.get(key, 0))
+            
+    @classmethod
+    def from_frame(cls, indicator, df):
+        # summary metrics of a backtest (run_strategy) dataframe
+        return cls(
+            Indicator=indicator["ind_t"],
+            Parameters=indicator["ind_p"],
+            Return_Market=float(df["Cumulative_Market"].iloc[-1]),
+            Return_Strategy=float(df["Cumulative_Strategy"].iloc[-1]),
+            Trades=float(df["Cumulative_Trades"].iloc[-1]//2),
+            Sharpe=float(df["Strategy"].mean()/df["Strategy"].std()*pow(len(df["Strategy"]), 0.5)),
+            Max_Drawdown=float(abs(df["Drawdown"].min())),
+        )
+    
+    @classmethod
+    def from_batch(cls, indicator, row):
+        # summary metrics of a strategy from a row of run_batch (same values as from_frame)
+        return cls(
+            Indicator=indicator["ind_t"],
+            Parameters=indicator["ind_p"],
+            **{key: float(row[key]) for key in ["Return_Market", "Return_Strategy", "Trades", "Sharpe", "Max_Drawdown"]},
+        )
+    
+    def keys(self):
+        return self.__slots__
+    
+    def __getitem__(self, key):
+        return getattr(self, key)
+    
+    def __getstate__(self):
+        return [getattr(self, key) for key in self.__slots__]
+    
+    def __setstate__(self, state):
+        for key, value in zip(self.__slots__, state):
+            setattr(self, key, value)
@@ -1,4 +1,4 @@
-import json
+import json, os, pickle
 import pandas as pd
 from datetime import datetime
 
@@ -21,15 +21,73 @@ class Exporter:
         df[float_cols] = df[float_cols].round(n)
         return df        
         
+    def save_frame(self, ticker, label, df):
+        # stream dataframe of a strategy to disk (instead of keeping it in memory)
+        os.makedirs(f"data/debug/{ticker}", exist_ok=True)
+        df.to_parquet(f"data/debug/{ticker}/{label}.parquet")
+        
+    def load_frame(self, ticker, label):
+        return pd.read_parquet(f"data/debug/{ticker}/{label}.parquet")
+    
+    def save_fitted(self, ticker, label, model):
+        # trained model of a strategy next to its dataframe (saved for the best strategy without retraining)
+        os.makedirs(f"data/debug/{ticker}", exist_ok=True)
+        with open(f"data/debug/{ticker}/{label}.pkl", "wb") as f:
+            pickle.dump(model, f)
+    
+    def load_fitted(self, ticker, label):
+        # None when the job of the strategy did not run (e.g. results resumed from a checkpoint)
+        path = f"data/debug/{ticker}/{label}.pkl"
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+        
     def export_dataframe(self, pro_data):
-        # export dataframe for further analysis
+        # export dataframe for further analysis (None: streamed to disk, read one at a time)
         for ticker, ticker_debug in pro_data.items():
             with pd.ExcelWriter(f"data/debug/{ticker}.xlsx", engine="xlsxwriter") as writer:
                 for sheet_name, df in ticker_debug.items():
+                    if df is None:
+                        df = self.load_frame(ticker, sheet_name)
                     # write to .xlsx
                     df = self.round_dataframe(df)
                     df.to_excel(writer, sheet_name=sheet_name[:20])
 
+    def export_frames(self, pro_data):
+        # long table of dataframes (column Label), one Parquet partition for each ticker
+        for ticker, ticker_debug in pro_data.items():
+            frames = []
+            for label, df in ticker_debug.items():
+                if df is None:
+                    df = self.load_frame(ticker, label)
+                frames.append(df.assign(Label=label))
+            os.makedirs(f"data/debug/frames/Ticker={ticker}", exist_ok=True)
+            pd.concat(frames).to_parquet(f"data/debug/frames/Ticker={ticker}/part.parquet")
+            
+    def export_results(self, bst_data):
+        # long table of best results (column Rank), one Parquet partition for each ticker
+        for ticker, bst_df in bst_data.items():
+            bst_df = bst_df.reset_index(drop=True).rename_axis("Rank").reset_index()
+            os.makedirs(f"data/results/results/Ticker={ticker}", exist_ok=True)
+            bst_df.to_parquet(f"data/results/results/Ticker={ticker}/part.parquet", index=False)
+            
+    def export_excel(self, tickers):
+        # spreadsheets built from Parquet tables (same as export_dataframe and export_best_results)
+        for ticker in tickers:
+            df = pd.read_parquet(f"data/debug/frames/Ticker={ticker}/part.parquet")
+            with pd.ExcelWriter(f"data/debug/{ticker}.xlsx", engine="xlsxwriter") as writer:
+                for sheet_name, frame in df.groupby("Label", sort=False):
+                    frame = self.round_dataframe(frame.drop(columns="Label"))
+                    frame.to_excel(writer, sheet_name=sheet_name[:20])
+                    
+        with pd.ExcelWriter("data/results/results.xlsx", engine="xlsxwriter") as writer:
+            for ticker in tickers:
+                bst_df = pd.read_parquet(f"data/results/results/Ticker={ticker}/part.parquet")
+                bst_df["Parameters"] = bst_df["Parameters"].map(lambda p: p.tolist())
+                bst_df = self.round_dataframe(bst_df.drop(columns="Rank"))
+                bst_df.to_excel(writer, sheet_name=ticker[:10], index=False)
+
     def export_best_results(self, bst_data):
         # export best results (a spreadsheet for each ticker)
         with pd.ExcelWriter("data/results/results.xlsx", engine="xlsxwriter") as writer:
@@ -46,4 +104,20 @@ class Exporter:
                 # write to .csv
                 row    = bst_df.iloc[0]
                 params = "_".join(str(p) for p in row["Parameters"])
-                f.write(f"{ticker},{row['Indicator']},{params}\n")
\ No newline at end of file
+                f.write(f"{ticker},{row['Indicator']},{params}\n")
+    
+    def export_sweep(self, sweep_data):
+        # metrics of best strategies for each set of backtest parameters (sensitivity to hysteresis, persistence and volume_ma)
+        df = pd.concat([sweep_df.assign(Ticker=ticker) for ticker, sweep_df in sweep_data.items()], ignore_index=True)
+        df = self.round_dataframe(df[["Ticker", *df.columns[:-1]]], 6)
+        df.to_csv("data/results/sweep.csv", index=False)
+    
+    def export_presets(self, ranking):
+        # best strategies of each ticker for each preset (comparison of presets)
+        with open("data/results/presets.csv", "w") as f:
+            f.write("Ticker,Preset,Rank,Indicator,Parameters,Score\n")
+            for ticker in ranking.tickers():
+                for preset in ranking.names:
+                    for rank, (label, row) in enumerate(ranking.top(ticker, preset).iterrows(), 1):
+                        params = "_".join(str(p) for p in row["Parameters"])
+                        f.write(f"{ticker},{preset},{rank},{row['Indicator']},{params},{row['Score']:.6f}\n")
@@ -1,39 +1,46 @@
-import json, warnings
+import json, copy, warnings
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.ensemble import ExtraTreesRegressor
-from sklearn.ensemble import GradientBoostingRegressor
-from sklearn.ensemble import RandomTreesEmbedding
-from sklearn.neighbors import KNeighborsRegressor
-from sklearn.linear_model import LinearRegression
-from sklearn.linear_model import Ridge
-from statsmodels.tsa.arima.model import ARIMA
+from core.registry import Registry
+from core.tracer import tracer
 
 
 # =====================================================
 #  Forecaster
 # =====================================================
 class Forecaster:
-    def __init__(self, indicator, df, file_config="config/config.json"):
+    def __init__(self, indicator, df, file_config="config/config.json", features=None, fitted=None, horizon_fitted=None):
         self.indicator = indicator
-        self.df = df.copy()
+        self.df = df                # read-only (may be a view of a shared panel)
         self.model  = None
+        self.fitted = fitted        # model trained on training data (given one skips training)
+        self.horizon_fitted = horizon_fitted  # direct multi-output model of next horizon closes
+        self.features = features    # lag matrices shared by indicators of same ticker {n_lags: (X, Y)}
         self.load_config(file_config)
         
     def load_config(self, path):
         with open(path, "r", encoding="utf-8") as f:
             config = json.load(f)
             self.N = config.get("N_train", 100)
+            self.horizon = config.get("horizon", 1)                                      # closes forecast ahead (predict_horizon)
+            self.refit_every = config.get("walk_forward", {}).get("refit_every", 0)        # samples between retrainings (0 trains once)
+            self.window = config.get("walk_forward", {}).get("window", "expanding")       # expanding or rolling (N samples) training window
+            self.warm_estimators = config.get("walk_forward", {}).get("warm_estimators", 5) # estimators added in each warm start
             
     def build_features(self, y):
-        X, Y = [], []
-        for i in range(self.n_lags, len(y)):
-            X.append(y.iloc[i-self.n_lags:i])
-            Y.append(y.iloc[i])
-        return np.array(X), np.array(Y)
+        # reuse lag matrix when already built for this ticker
+        if self.features is not None and self.n_lags in self.features:
+            return self.features[self.n_lags]
+        
+        # sliding windows of n_lags +1 samples (read-only view, no copy per row)
+        W = np.lib.stride_tricks.sliding_window_view(np.asarray(y, dtype=float), self.n_lags +1)
+        X, Y = W[:, :-1], W[:, -1]
+        
+        if self.features is not None:
+            self.features[self.n_lags] = (X, Y)
+        return X, Y
                 
     def predictions(self):
-        df = self.df.copy()
+        df = self.df.copy(deep=False)
         y  = df["Close"]
         
         method = self.indicator.get("ind_t", "RF")
@@ -46,41 +53,63 @@ class Forecaster:
             self.n_estimators, self.max_depth, self.n_lags = params
             
             # build features for ML models:
-            X, Y = self.build_features(y)
+            with tracer.span("features"):
+                X, Y = self.build_features(y)
             
             # train data and test data
             X_train, Y_train = X[:self.N], Y[:self.N]
             X_test, Y_test   = X[self.N:], Y[self.N:]
             
-            # define method and trainning
-            model = self.MODELS[method](params)
-            model.fit(X_train, Y_train)
+            # define method and trainning (unless already trained)
+            model = self.fitted
+            if model is None:
+                with tracer.span("fit"):
+                    model = self.MODELS[method](params)
+                    model.fit(X_train, Y_train)
+            self.fitted = model
             
             # predictions
-            y_hat = model.predict(X_test)
+            if not self.refit_every:
+                with tracer.span("predict"):
+                    y_hat = model.predict(X_test)
+            else:
+                # walk-forward: retrain every refit_every samples (trained model kept unchanged)
+                model = copy.deepcopy(model)
+                y_hat = []
+                for k in range(self.N, len(X), self.refit_every):
+                    if k > self.N:
+                        start = 0 if self.window == "expanding" else k -self.N
+                        with tracer.span("refit"):
+                            self.update(model, X[start:k], Y[start:k], self.refit_every)
+                    with tracer.span("predict"):
+                        y_hat.append(model.predict(X[k:k +self.refit_every]))
+                y_hat = np.concatenate(y_hat) if y_hat else np.array([])
 
         # statistical methods
         elif method == "ARIMA":
             # AR order, differencing order, MA order
             p, d, q = params
             
+            ARIMA = self.MODELS.load("ARIMA")
             with warnings.catch_warnings():
                 warnings.filterwarnings("ignore", category=UserWarning)
                 warnings.filterwarnings("ignore", category=FutureWarning)
                 self.n_lags = 0
                 y_train, y_test = y.iloc[:self.N], y.iloc[self.N:]
                 
-                # model class and trainning
-                model = ARIMA(y_train, order=(p, d, q), enforce_stationarity=False, enforce_invertibility=False).fit()
+                # model class and trainning (unless already trained)
+                model = self.fitted
+                if model is None:
+                    with tracer.span("fit"):
+                        model = ARIMA(y_train, order=(p, d, q), enforce_stationarity=False, enforce_invertibility=False).fit()
+                self.fitted = model
                 
-                #y_history = list(y_train.values)
-                y_hat = []
-                for k in range(len(y_test)):
-                    # predictions
-                    y_pred = model.forecast().iloc[0]
-                    y_hat.append(y_pred)
-                    #y_history.append(y_test.iloc[k])
-                    model = model.append([y_test.iloc[k]], refit=False)
+                # walk-forward in one pass: filter test data with fixed parameters (no refit)
+                with tracer.span("walk_forward"):
+                    model = model.append(y_test.values, refit=False)
+                    
+                    # predictions (one-step-ahead for each test sample)
+                    y_hat = model.predict(start=self.N, end=len(y)-1)
             y_hat = np.asarray(y_hat).ravel()
                 
         # save model            
@@ -92,6 +121,121 @@ class Forecaster:
         df["Predicted_Close"] = pred
         return df
     
+    def fit_horizon(self):
+        # direct multi-output model: next horizon closes from the same lags (training samples)
+        method = self.indicator.get("ind_t")
+        if self.horizon <= 1 or method == "ARIMA":
+            return None
+        W = np.lib.stride_tricks.sliding_window_view(np.asarray(self.df["Close"], dtype=float), self.n_lags +self.horizon)
+        X, Y = W[:self.N, :self.n_lags], W[:self.N, self.n_lags:]
+        
+        model = self.MODELS[method](self.indicator["ind_p"])
+        if method not in self.MULTI_OUTPUT:
+            from sklearn.multioutput import MultiOutputRegressor
+            model = MultiOutputRegressor(model)
+        with tracer.span("fit_horizon"):
+            model.fit(X, Y)
+        self.horizon_fitted = model
+        return model
+    
+    def update(self, model, X, Y, n_new):
+        # retrain on current window: incremental when supported, else full refit
+        from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor, GradientBoostingRegressor
+        if hasattr(model, "partial_fit"):
+            model.partial_fit(X[-n_new:], Y[-n_new:])
+        elif isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+            # warm start: add trees trained on current window and drop the oldest ones
+            n_trees = len(model.estimators_)
+            model.set_params(warm_start=True, n_estimators=n_trees +self.warm_estimators)
+            model.fit(X, Y)
+            model.estimators_ = model.estimators_[self.warm_estimators:]
+            model.set_params(n_estimators=n_trees)
+        elif isinstance(model, GradientBoostingRegressor):
+            # warm start: add boosting stages fitted on current window
+            model.set_params(warm_start=True, n_estimators=model.n_estimators +self.warm_estimators)
+            model.fit(X, Y)
+        else:
+            model.fit(X, Y)
+        return model
+    
+    @classmethod
+    def families(cls, indicators):
+        # group nested indicators (same method and parameters except the nested one)
+        groups = {}
+        for k, indicator in enumerate(indicators):
+            method, params = indicator["ind_t"], list(indicator["ind_p"])
+            if method in cls.NESTED:
+                n   = cls.NESTED[method]
+                key = (method, *params[:n], *params[n+1:])
+            else:
+                key = (method, k)
+            groups.setdefault(key, []).append(indicator)
+        return list(groups.values())
+    
+    def predictions_family(self, indicators):
+        # predictions of nested indicators from one model (trained with largest nested parameter)
+        # trained model of each indicator in self.family_fitted
+        method = indicators[0]["ind_t"]
+        if len(indicators) == 1:
+            self.indicator = indicators[0]
+            dfs = [self.predictions()]
+            self.family_fitted = [self.fitted]
+            return dfs
+        if self.refit_every:
+            # retrained models are no longer nested: train each one
+            dfs, self.family_fitted = [], []
+            for indicator in indicators:
+                self.indicator, self.fitted = indicator, None
+                dfs.append(self.predictions())
+                self.family_fitted.append(self.fitted)
+            return dfs
+        if method not in self.NESTED:
+            raise ValueError(f"No nested parameter for method: {method}.")
+        n     = self.NESTED[method]
+        sizes = sorted({indicator["ind_p"][n] for indicator in indicators})
+        self.indicator = max(indicators, key=lambda indicator: indicator["ind_p"][n])
+        df = self.predictions()
+        
+        X, Y   = self.build_features(df["Close"])
+        X_test = X[self.N:]
+        with tracer.span("predict_family"):
+            if method == "KN":
+                # one neighbours query, mean of k nearest for each k
+                _, idx = self.model.kneighbors(X_test)
+                Y_near = Y[:self.N][idx]
+                y_hat  = {k: Y_near[:, :k].mean(axis=1) for k in sizes}
+            elif method == "GB":
+                # first stages of boosting
+                y_hat = {k: pred for k, pred in enumerate(self.model.staged_predict(X_test), 1) if k in sizes}
+            else:
+                # mean of first trees (same trees as a forest with less estimators and same seed)
+                Y_tree = np.cumsum([tree.predict(X_test) for tree in self.model.estimators_], axis=0)
+                y_hat  = {k: Y_tree[k-1]/k for k in sizes}
+        
+        # add to dataframes
+        dfs = []
+        for indicator in indicators:
+            pred = np.full(len(df), np.nan)
+            pred[self.N+self.n_lags: self.N+self.n_lags+len(X_test)] = y_hat[indicator["ind_p"][n]]
+            dfs.append(df.assign(Predicted_Close=pred))
+        self.family_fitted = [self.nested_fitted(indicator) for indicator in indicators]
+        return dfs
+    
+    def nested_fitted(self, indicator):
+        # trained model of a smaller nested parameter from the model of largest (same as training it alone)
+        method, n = indicator["ind_t"], self.NESTED[indicator["ind_t"]]
+        size  = indicator["ind_p"][n]
+        model = copy.copy(self.fitted)
+        if method == "KN":
+            model.n_neighbors = size
+        else:
+            model.estimators_  = self.fitted.estimators_[:size]
+            model.n_estimators = size
+            if method == "GB":
+                model.n_estimators_ = size
+                model.train_score_  = self.fitted.train_score_[:size]
+        return model
+    
     def predict_next(self):
         if self.model is None:
             raise ValueError("No existing model.")
@@ -104,13 +248,34 @@ class Forecaster:
             y_hat  = self.model.predict(last_Y)[0]
         return y_hat
     
-    MODELS = {
-        "RF": lambda params: RandomForestRegressor(n_estimators=params[0], max_depth=params[1], random_state=0),
-        "RT": lambda params: RandomTreesEmbedding(n_estimators=params[0], max_depth=params[1]),
-        "ET": lambda params: ExtraTreesRegressor(n_estimators=params[0], max_depth=params[1]),
-        "GB": lambda params: GradientBoostingRegressor(n_estimators=params[0], max_depth=params[1]),
-        "KN": lambda params: KNeighborsRegressor(n_neighbors=params[1]),
-        "LR": lambda params: LinearRegression(),
-        "RR": lambda params: Ridge(alpha=1.0),
-        "ARIMA": lambda params: None
-    }
\ No newline at end of file
+    def predict_horizon(self):
+        # forecasts of next horizon closes in one call (no recursion of one-step forecasts)
+        if self.model is None:
+            raise ValueError("No existing model.")
+        method = self.indicator.get("ind_t")
+        
+        if method == "ARIMA":
+            return np.asarray(self.model.forecast(steps=self.horizon)).ravel()
+        if self.horizon <= 1:
+            return np.array([self.predict_next()])
+        if self.horizon_fitted is None:
+            self.fit_horizon()
+        last_Y = self.df["Close"].iloc[-self.n_lags:].values.reshape(1, -1)
+        return self.horizon_fitted.predict(last_Y).ravel()
+    
+    # model types (backends imported on first use, new types added with Forecaster.MODELS.register)
+    MODELS = Registry()
+    MODELS.register("RF", "sklearn.ensemble:RandomForestRegressor", lambda cls, params: cls(n_estimators=params[0], max_depth=params[1], random_state=0))
+    MODELS.register("RT", "sklearn.ensemble:RandomTreesEmbedding", lambda cls, params: cls(n_estimators=params[0], max_depth=params[1], random_state=0))
+    MODELS.register("ET", "sklearn.ensemble:ExtraTreesRegressor", lambda cls, params: cls(n_estimators=params[0], max_depth=params[1], random_state=0))
+    MODELS.register("GB", "sklearn.ensemble:GradientBoostingRegressor", lambda cls, params: cls(n_estimators=params[0], max_depth=params[1], random_state=0))
+    MODELS.register("KN", "sklearn.neighbors:KNeighborsRegressor", lambda cls, params: cls(n_neighbors=params[1]))
+    MODELS.register("LR", "sklearn.linear_model:LinearRegression")
+    MODELS.register("RR", "sklearn.linear_model:Ridge", lambda cls, params: cls(alpha=1.0))
+    MODELS.register("ARIMA", "statsmodels.tsa.arima.model:ARIMA", lambda cls, params: None)
+    
+    # index of nested parameter (predictions for smaller values from the model of largest)
+    NESTED = {"RF": 0, "ET": 0, "GB": 0, "KN": 1}
+    
+    # native multi-output models (others wrapped in MultiOutputRegressor for horizon)
+    MULTI_OUTPUT = {"RF", "ET", "KN", "LR", "RR"}
\ No newline at end of file
@@ -0,0 +1,104 @@
+import time
+from collections import deque
+import numpy as np
+from core.forecaster import Forecaster
+from core.backtester import Backtester
+from core.tracer import tracer
+
+
+# =====================================================
+#  Live Ticker (warm model and backtest state)
+# =====================================================
+class LiveTicker:
+    def __init__(self, ticker, indicator, df, store, state_dir="data/state"):
+        self.ticker    = ticker
+        self.indicator = indicator
+        self.path      = f"{state_dir}/{ticker}.json"
+
+        # trained model (retrain when stale)
+        fitted, meta = store.load(ticker)
+        if store.is_stale(meta, indicator, df):
+            fitted = None
+        horizon_fitted = None if fitted is None else store.load_horizon(ticker, meta)
+
+        # predictions of history (model keeps the state of all samples)
+        forecaster = Forecaster(indicator, df, fitted=fitted, horizon_fitted=horizon_fitted)
+        df = forecaster.predictions()
+        if fitted is None:
+            forecaster.fit_horizon()
+            meta = store.save(ticker, indicator, forecaster)
+        self.meta    = meta
+        self.model   = forecaster.model
+        self.horizon = forecaster.horizon
+        self.horizon_model = forecaster.horizon_fitted
+        self.closes = deque(df["Close"].iloc[-forecaster.n_lags:] if forecaster.n_lags else [], maxlen=forecaster.n_lags)
+
+        # incremental backtest (only samples after saved state of same model)
+        with tracer.span("backtest"):
+            self.state = Backtester(df).run_state(self.path, version=meta["version"])
+        self.forecast = self.predict_next()
+        self.outlook  = self.predict_horizon()
+        self.bars     = 0                       # new bars since start
+        self.latency  = deque(maxlen=1000)      # seconds from bar arrival to signal
+
+    def predict_next(self):
+        # forecast of next close (one step ahead of last sample)
+        if self.indicator["ind_t"] == "ARIMA":
+            return float(np.asarray(self.model.forecast()).ravel()[0])
+        return float(self.model.predict(np.asarray(self.closes, dtype=float).reshape(1, -1))[0])
+
+    def predict_horizon(self):
+        # forecasts of next horizon closes (one call of direct multi-output model)
+        if self.indicator["ind_t"] == "ARIMA":
+            return np.asarray(self.model.forecast(steps=self.horizon), dtype=float).ravel()
+        if self.horizon_model is None:
+            return np.array([self.forecast])
+        return self.horizon_model.predict(np.asarray(self.closes, dtype=float).reshape(1, -1)).ravel()
+
+    def update(self, bars, arrival=None):
+        # new bars (Close and Volume columns, index of dates): forecast made before each bar, then backtest state
+        arrival = time.perf_counter() if arrival is None else arrival
+        for date, close, volume in zip(bars.index, bars["Close"], bars["Volume"]):
+            if self.state.date is not None and date <= self.state.date:
+                continue
+            self.state.update(date, float(close), float(volume), self.forecast)
+            self.closes.append(float(close))
+            if self.indicator["ind_t"] == "ARIMA":
+                # filter only the new sample with fixed parameters (append would filter all samples again)
+                self.model = self.model.extend([float(close)])
+            self.forecast = self.predict_next()
+            self.bars += 1
+        self.outlook = self.predict_horizon()
+        self.state.save(self.path)
+        self.latency.append(time.perf_counter() -arrival)
+        return self.alert()
+
+    def alert(self):
+        # last values: closing price, signal, signal length, volume strength, entry price, forecast
+        return {
+            "Ticker": self.ticker,
+            "Indicator": self.indicator["ind_t"],
+            "Parameters": [str(p) for p in self.indicator["ind_p"]],
+            "Close": float(self.state.close),
+            "Signal": int(self.state.signal),
+            "Signal_Length": int(self.state.signal_length),
+            "Volume_Strength": float(self.state.volume_strength),
+            "Entry_Price": float(self.state.entry_price),
+            "Predicted_Close": float(self.forecast),
+            "Predicted_Path": [float(p) for p in self.outlook]
+        }
+
+    def metrics(self):
+        latency = np.asarray(self.latency)*1000
+        return {
+            "last_bar": None if self.state.date is None else str(self.state.date),
+            "bars": self.bars,
+            "signal": int(self.state.signal),
+            "model_version": self.meta["version"],
+            "latency_ms": {
+                "last": float(latency[-1]) if len(latency) else None,
+                "p50": float(np.percentile(latency, 50)) if len(latency) else None,
+                "p95": float(np.percentile(latency, 95)) if len(latency) else None,
+                "max": float(latency.max()) if len(latency) else None,
+            },
+        }
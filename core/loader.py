@@ -1,6 +1,9 @@
-import json
+import json, os
+import numpy as np
+import pandas as pd
 import yfinance as yf
-from datetime import datetime
+from datetime import datetime, timedelta
+from core.tracer import tracer
 
 
 # =====================================================
@@ -18,6 +21,8 @@ class Loader:
             config = json.load(f)
             self.start = config.get("start", "2024-01-01")
             self.end = config.get("end", datetime.now())
+            self.cache = config.get("cache", {}).get("dir", None)           # local OHLCV cache (None disables)
+            self.offline = config.get("cache", {}).get("offline", False)    # serve only from cache
         
     def load_tickers(self):
         with open(self.file_tickers, "r", encoding="utf-8") as f:
@@ -54,14 +59,64 @@ class Loader:
             return f"{ticker}.SA"
         return ticker
 
-    def download_data(self, ticker):
+    def fetch_data(self, ticker, start, end):
         # collect OHLCVDS data from Yahoo Finance
         try:
-            df = yf.download(self.format_ticker(ticker), self.start, self.end, auto_adjust=True)
+            with tracer.span("download", ticker=ticker):
+                df = yf.download(self.format_ticker(ticker), start, end, auto_adjust=True)
         except Exception as err:
             raise RuntimeError("Unexpected error in download_data.") from err
         
         # format data
+        if df.empty:
+            return pd.DataFrame(columns=["Close", "Volume"], index=pd.DatetimeIndex([], name="Date"))
         df.columns = df.columns.droplevel(1)    
         df = df[["Close", "Volume"]]
-        return df
\ No newline at end of file
+        return df
+        
+    def download_data(self, ticker):
+        if self.cache is None:
+            return self.fetch_data(ticker, self.start, self.end)
+        
+        # load cached data
+        path  = os.path.join(self.cache, f"{ticker}.parquet")
+        start = pd.Timestamp(self.start)
+        end   = pd.Timestamp(self.end)
+        with tracer.span("cache_read", ticker=ticker):
+            df = pd.read_parquet(path) if os.path.exists(path) else None
+        
+        # start requested when cache was downloaded (first cached date may be later: holidays)
+        covered = None
+        if df is not None and len(df):
+            covered = pd.Timestamp(df.attrs.get("start", df.index[0]))
+            df.attrs = {}
+        
+        if self.offline:
+            if df is None:
+                raise RuntimeError(f"No cached data for {ticker} in offline mode.")
+        elif df is None or len(df) < 2 or covered > start:
+            # cache missing or not covering start: full download
+            df = self.fetch_data(ticker, start, end)
+            self.save_cache(df, path, start)
+            covered = start
+        else:
+            # incremental download (overlapping last two cached samples)
+            new = self.fetch_data(ticker, df.index[-2], end)
+            if len(new) and df.index[-2] in new.index and not np.isclose(new.loc[df.index[-2], "Close"], df.loc[df.index[-2], "Close"]):
+                # history was adjusted (dividends, splits): full download
+                df = self.fetch_data(ticker, start, end)
+                covered = start
+            else:
+                df = pd.concat([df, new])
+                df = df[~df.index.duplicated(keep="last")]
+            self.save_cache(df, path, covered)
+        return df.loc[start:end - timedelta(microseconds=1)]
+    
+    def save_cache(self, df, path, start):
+        # start: first date requested (saved in parquet metadata)
+        with tracer.span("cache_write"):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            df = df.copy(deep=False)
+            df.attrs = {"start": str(pd.Timestamp(start).date())}
+            df.to_parquet(f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
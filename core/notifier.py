@@ -1,17 +1,45 @@
-import os, requests, smtplib
+import os, time, threading, requests, smtplib
 from dotenv import load_dotenv
 from email.message import EmailMessage
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+
+# =====================================================
+#  Token Bucket (rate limiter)
+# =====================================================
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate   = rate      # tokens per second
+        self.burst  = burst     # bucket capacity
+        self.tokens = burst
+        self.last   = time.monotonic()
+        self.lock   = threading.Lock()
+        
+    def acquire(self):
+        # wait until one token is available
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens +(now -self.last)*self.rate)
+                self.last   = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 -self.tokens)/self.rate
+            time.sleep(wait)
 
 
 # =====================================================
 #  Notifier
 # =====================================================
 class Notifier:
-    def __init__(self):
+    def __init__(self, rate=20/60, burst=20, retries=3, backoff=1.0, workers=4):
         load_dotenv()
         # Telegram bot TOKEN and channel ID
         self.TOKEN    = os.getenv("TOKEN")      # bot TOKEN
         self.CHAT_ID  = os.getenv("CHAT_ID")    # channel ID
+        self.API      = os.getenv("TELEGRAM_API", "https://api.telegram.org")   # API endpoint (local stand-in for tests)
         
         # E-mail
         self.EMAIL_FROM  = os.getenv('EMAIL_FROM')
@@ -19,18 +47,101 @@ class Notifier:
         self.EMAIL_PASS  = os.getenv('EMAIL_PASSWORD')
         self.SMTP_SERVER = os.getenv('SMTP_SERVER')
         self.SMTP_PORT   = os.getenv('SMTP_PORT')
+        self.SMTP_PLAINTEXT = os.getenv('SMTP_PLAINTEXT', '') == '1'    # allow login without TLS (local stand-in only)
+        
+        # pooled connections, rate limit of each chat (Telegram: 20 messages per minute in groups/channels) and retries
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=workers))
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=workers))
+        self.rate    = rate
+        self.burst   = burst
+        self.buckets = {}
+        self.buckets_lock = threading.Lock()
+        self.retries = retries
+        self.backoff = backoff
+        self.workers = workers
+        self.smtp    = None
+        self.smtp_lock = threading.Lock()
         
-    def send_telegram(self, msg):
-        payload = {"chat_id": self.CHAT_ID, "text": f"<b>Summary:</b>\n{msg}", "parse_mode": "HTML", "disable_web_page_preview": True}
-        try:
-            url = f"https://api.telegram.org/bot{self.TOKEN}/sendMessage"
-            r = requests.post(url, json=payload, timeout=10)
-            r.raise_for_status()
-            msg_id = r.json()["result"]["message_id"]
-            print("Telegram sent.")
-        except Exception as err:
-            print(f"Telegram fail: {err}")
+    def bucket(self, chat_id):
+        # rate limiter of a chat (limits are per chat)
+        with self.buckets_lock:
+            if chat_id not in self.buckets:
+                self.buckets[chat_id] = TokenBucket(self.rate, self.burst)
+            return self.buckets[chat_id]
+        
+    def send_telegram(self, msg, chat_id=None):
+        chat_id = chat_id or self.CHAT_ID
+        bucket  = self.bucket(chat_id)
+        payload = {"chat_id": chat_id, "text": f"<b>Summary:</b>\n{msg}", "parse_mode": "HTML", "disable_web_page_preview": True}
+        url     = f"{self.API}/bot{self.TOKEN}/sendMessage"
+        msg_id  = None
+        for attempt in range(self.retries +1):
+            bucket.acquire()
+            wait  = self.backoff*2**attempt     # exponential backoff
+            retry = True
+            try:
+                r = self.session.post(url, json=payload, timeout=10)
+                if r.status_code == 429:
+                    # rate limited by Telegram: wait the requested time
+                    wait = r.json().get("parameters", {}).get("retry_after", wait)
+                retry = r.status_code == 429 or r.status_code >= 500
+                r.raise_for_status()
+                msg_id = r.json()["result"]["message_id"]
+                print("Telegram sent.")
+                break
+            except Exception as err:
+                if attempt == self.retries or not retry:
+                    print(f"Telegram fail: {err}")
+                    break
+                time.sleep(wait)
         return msg_id
+    
+    def send_telegram_many(self, msgs, chat_ids=None):
+        # in order within each chat, concurrently among chats (message IDs in same order, None if failed)
+        chat_ids = chat_ids or [self.CHAT_ID]*len(msgs)
+        chats    = {}
+        for k, chat_id in enumerate(chat_ids):
+            chats.setdefault(chat_id, []).append(k)
+        
+        msg_ids = [None]*len(msgs)
+        def send_chat(chat_id, ks):
+            for k in ks:
+                msg_ids[k] = self.send_telegram(msgs[k], chat_id)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(chats)))) as pool:
+            for future in [pool.submit(send_chat, chat_id, ks) for chat_id, ks in chats.items()]:
+                future.result()
+        return msg_ids
+        
+    @staticmethod
+    def alert_message(a):
+        # trading message of a signal (alert of a ticker)
+        if a["Signal"] != 0:       
+            verb = "⬆️ BUY" if a["Signal"] == 1 else "⬇️ SELL"
+        else:
+            verb = "⏸️ NEUTRAL"
+        msg = (f"#{a['Ticker']} | {verb} ({a['Indicator']}{'/'.join(a['Parameters'])}) Duration {a['Signal_Length']:d} | Price R$ {a['Close']:.2f}\n"
+               f"Volume Strength: {a['Volume_Strength']:.2f}\n"
+               f"Entry Price: R$ {a['Entry_Price']:.2f}\n"
+               f"Predicted Price: R$ {a['Predicted_Close']:.2f}")
+        
+        # next closes (multi-horizon forecast)
+        path = a.get("Predicted_Path", [])
+        if len(path) > 1:
+            msg += f"\nOutlook ({len(path)} bars): R$ " +" / ".join(f"{p:.2f}" for p in path)
+        return msg
+        
+    def connect_smtp(self):
+        # open SMTP connection (reused by next e-mails)
+        server = smtplib.SMTP(self.SMTP_SERVER, self.SMTP_PORT, timeout=30)
+        server.ehlo()
+        if server.has_extn("starttls") or (self.EMAIL_PASS and not self.SMTP_PLAINTEXT):
+            # TLS required before login (raises when server does not offer it)
+            server.starttls()
+            server.ehlo()
+        if self.EMAIL_PASS:
+            server.login(self.EMAIL_FROM, self.EMAIL_PASS)
+        return server
         
     def send_email(self, subject, body):
         msg = EmailMessage()
@@ -39,11 +150,29 @@ class Notifier:
         msg['From']    = self.EMAIL_FROM
         msg['To']      = self.EMAIL_TO
 
-        try:
-            with smtplib.SMTP(self.SMTP_SERVER, self.SMTP_PORT) as server:
-                server.starttls()
-                server.login(self.EMAIL_FROM, self.EMAIL_PASS)
-                server.send_message(msg)
-                print("E-mail sent.")
-        except Exception as err:
-            print(f"E-mail fail: {err}")
\ No newline at end of file
+        with self.smtp_lock:
+            for attempt in range(self.retries +1):
+                try:
+                    if self.smtp is None:
+                        self.smtp = self.connect_smtp()
+                    self.smtp.send_message(msg)
+                    print("E-mail sent.")
+                    break
+                except Exception as err:
+                    self.close_smtp()
+                    if attempt == self.retries:
+                        print(f"E-mail fail: {err}")
+                        break
+                    time.sleep(self.backoff*2**attempt)
+                    
+    def close_smtp(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except Exception:
+                pass
+            self.smtp = None
+            
+    def close(self):
+        self.close_smtp()
+        self.session.close()
@@ -0,0 +1,60 @@
+import os, uuid, tempfile
+import numpy as np
+import pandas as pd
+
+
+# =====================================================
+#  Price Panel (shared by worker processes)
+# =====================================================
+class Panel:
+    COLUMNS = ["Close", "Volume"]
+    
+    def __init__(self, path, tickers, rows):
+        self.path    = path         # memory-mapped files (without extension)
+        self.tickers = tickers      # {ticker: position in panel}
+        self.rows    = rows         # {ticker: date positions (slice when contiguous)}
+        self.open()
+        
+    def open(self):
+        # read-only views (pages shared among processes)
+        self.values = np.load(f"{self.path}.npy", mmap_mode="r")     # (tickers, columns, dates)
+        self.dates  = pd.DatetimeIndex(np.load(f"{self.path}_dates.npy"), name="Date")
+        
+    @classmethod
+    def build(cls, data, path=None):
+        # align Close/Volume of all tickers on one date index
+        path  = path or os.path.join(tempfile.gettempdir(), f"panel_{uuid.uuid4().hex}")
+        dates = pd.DatetimeIndex(sorted(set().union(*(df.index for df in data.values()))))
+        np.save(f"{path}_dates.npy", dates.values.astype("datetime64[ns]"))
+        
+        values = np.lib.format.open_memmap(f"{path}.npy", mode="w+", dtype=float, shape=(len(data), len(cls.COLUMNS), len(dates)))
+        values[:] = np.nan
+        tickers, rows = {}, {}
+        for k, (ticker, df) in enumerate(data.items()):
+            pos = dates.get_indexer(df.index)
+            values[k][:, pos] = df[cls.COLUMNS].to_numpy(dtype=float).T
+            tickers[ticker] = k
+            rows[ticker] = slice(pos[0], pos[-1] +1) if len(pos) and pos[-1] -pos[0] +1 == len(pos) else pos
+        values.flush()
+        del values
+        return cls(path, tickers, rows)
+    
+    def frame(self, ticker):
+        # dataframe of ticker (view of panel, no copy when its dates are contiguous)
+        k, rows = self.tickers[ticker], self.rows[ticker]
+        return pd.DataFrame(self.values[k][:, rows].T, index=self.dates[rows], columns=self.COLUMNS, copy=False)
+    
+    def __getstate__(self):
+        # only file path is sent to worker processes
+        return {"path": self.path, "tickers": self.tickers, "rows": self.rows}
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.open()
+        
+    def close(self):
+        # remove memory-mapped files
+        self.values = None
+        for path in [f"{self.path}.npy", f"{self.path}_dates.npy"]:
+            if os.path.exists(path):
+                os.remove(path)
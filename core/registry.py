@@ -0,0 +1,37 @@
+import importlib
+
+
+# =====================================================
+#  Model Registry
+# =====================================================
+class Registry:
+    def __init__(self):
+        self.entries = {}   # {name: (backend "module:Class" or class, builder(cls, params))}
+        self.classes = {}   # backends already imported
+        
+    def register(self, name, backend, build=None):
+        # backend imported only when the model is first requested (plugins may also pass the class)
+        self.entries[name] = (backend, build or (lambda cls, params: cls()))
+        self.classes.pop(name, None)
+        
+    def load(self, name):
+        if name not in self.entries:
+            raise ValueError(f"Unknown forecasting method: {name}.")
+        if name not in self.classes:
+            backend = self.entries[name][0]
+            if isinstance(backend, str):
+                module, attr = backend.split(":")
+                backend = getattr(importlib.import_module(module), attr)
+            self.classes[name] = backend
+        return self.classes[name]
+    
+    def __getitem__(self, name):
+        # model factory: params -> new model
+        cls, build = self.load(name), self.entries[name][1]
+        return lambda params: build(cls, params)
+    
+    def __contains__(self, name):
+        return name in self.entries
+    
+    def __iter__(self):
+        return iter(self.entries)
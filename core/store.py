@@ -0,0 +1,261 @@
+import json, os, pickle, hashlib, shutil, sqlite3
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+
+
+# =====================================================
+#  Model Store
+# =====================================================
+class ModelStore:
+    def __init__(self, file_config="config/config.json"):
+        self.load_config(file_config)
+        
+    def load_config(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+            cfg    = config.get("models", {})
+            self.path = cfg.get("dir", "data/models")
+            self.retrain_days = cfg.get("retrain_days", 7)  # maximum model age (days)
+            self.keep = cfg.get("keep", 3)                  # versions kept for each ticker
+            self.horizon = config.get("horizon", 1)         # closes forecast ahead (horizon model)
+            self.N = config.get("N_train", 100)             # training samples (before lags)
+            
+    def data_hash(self, df, n):
+        # fingerprint of the first n samples (training data)
+        df = df.iloc[:n]
+        h  = hashlib.sha256()
+        h.update(np.asarray(df.index.values.astype("datetime64[ns]").astype("int64")).tobytes())   # same for any time unit
+        h.update(np.ascontiguousarray(df["Close"].to_numpy(dtype=float)).tobytes())
+        return h.hexdigest()
+    
+    def versions(self, ticker):
+        path = os.path.join(self.path, ticker)
+        if not os.path.isdir(path):
+            return []
+        return sorted(int(v[1:]) for v in os.listdir(path) if v.startswith("v") and v[1:].isdigit())
+    
+    def save(self, ticker, indicator, forecaster):
+        # training samples: lags and targets of first N samples
+        n = forecaster.N +forecaster.n_lags
+        versions = self.versions(ticker)
+        version  = versions[-1] +1 if versions else 1
+        path     = os.path.join(self.path, ticker, f"v{version:04d}")
+        os.makedirs(path, exist_ok=True)
+        
+        meta = {
+            "ticker": ticker,
+            "version": version,
+            "indicator": indicator["ind_t"],
+            "params": list(indicator["ind_p"]),
+            "n_train": n,
+            "data_hash": self.data_hash(forecaster.df, n),
+            "last_date": str(forecaster.df.index[-1].date()),
+            "trained_at": datetime.now().isoformat(timespec="seconds"),
+            "horizon": forecaster.horizon,
+        }
+        with open(os.path.join(path, "model.pkl"), "wb") as f:
+            pickle.dump(forecaster.fitted, f)
+        if forecaster.horizon_fitted is not None:
+            with open(os.path.join(path, "horizon.pkl"), "wb") as f:
+                pickle.dump(forecaster.horizon_fitted, f)
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        
+        # remove older versions
+        for old in versions[:max(0, len(versions) +1 -self.keep)]:
+            shutil.rmtree(os.path.join(self.path, ticker, f"v{old:04d}"), ignore_errors=True)
+        return meta
+    
+    def load(self, ticker):
+        # load latest version (None if there is none)
+        versions = self.versions(ticker)
+        if not versions:
+            return None, None
+        path = os.path.join(self.path, ticker, f"v{versions[-1]:04d}")
+        try:
+            with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(os.path.join(path, "model.pkl"), "rb") as f:
+                model = pickle.load(f)
+        except Exception as err:
+            print(f"Model store fail for {ticker}: {err}")
+            return None, None
+        return model, meta
+    
+    def load_horizon(self, ticker, meta):
+        # horizon model of same version (None if there is none)
+        path = os.path.join(self.path, ticker, f"v{meta['version']:04d}", "horizon.pkl")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    
+    def is_stale(self, meta, indicator, df):
+        # model must be retrained when strategy, training window, training data or age changed
+        if meta is None:
+            return True
+        if meta["indicator"] != indicator["ind_t"] or meta["params"] != list(indicator["ind_p"]):
+            return True
+        n_lags = 0 if indicator["ind_t"] == "ARIMA" else indicator["ind_p"][2]
+        if meta["n_train"] != self.N +n_lags:
+            return True
+        if len(df) < meta["n_train"] or self.data_hash(df, meta["n_train"]) != meta["data_hash"]:
+            return True
+        if meta.get("horizon", 1) != self.horizon:
+            return True
+        return datetime.now() -datetime.fromisoformat(meta["trained_at"]) > timedelta(days=self.retrain_days)
+
+
+# =====================================================
+#  Checkpoint (results of finished jobs)
+# =====================================================
+class Checkpoint:
+    def __init__(self, file_config="config/config.json"):
+        self.load_config(file_config)
+        
+    def load_config(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+            cfg    = config.get("checkpoint", {})
+            self.path    = cfg.get("dir", "data/checkpoint")
+            self.enabled = cfg.get("enabled", True)
+            # settings that change results of jobs (others only change outputs)
+            self.config  = {key: value for key, value in config.items() if key not in self.IGNORE}
+            if "backtest" in self.config:
+                self.config["backtest"] = {key: value for key, value in self.config["backtest"].items() if key != "sweep"}
+            
+    def key(self, df, *parts):
+        # fingerprint of all data of ticker, config and job (indicators, search)
+        h = hashlib.sha256()
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        h.update(json.dumps([self.config, *parts], sort_keys=True, default=str).encode())
+        return h.hexdigest()[:32]
+    
+    def stamp(self, path):
+        # size and modification time of a file (None if missing)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+    
+    def load(self, ticker, key):
+        # results of finished job (None if not finished, unreadable or its files were changed or removed)
+        path = os.path.join(self.path, ticker, f"{key}.pkl")
+        if not self.enabled or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as err:
+            print(f"Checkpoint fail for {ticker}: {err}")
+            return None
+        if not isinstance(state, dict) or any(self.stamp(file) != stamp for file, stamp in state["files"].items()):
+            return None
+        return state["results"]
+    
+    def save(self, ticker, key, results, files=()):
+        # results (metric records) and the files they refer to (dataframes and models streamed to disk)
+        if not self.enabled:
+            return
+        path = os.path.join(self.path, ticker, f"{key}.pkl")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path +".tmp", "wb") as f:
+            pickle.dump({"results": results, "files": {file: self.stamp(file) for file in files}}, f)
+        os.replace(path +".tmp", path)      # atomic (interrupted job leaves no partial checkpoint)
+        
+    def prune(self, keys):
+        # remove checkpoints of jobs not in the last run ({ticker: keys})
+        for ticker in os.listdir(self.path) if os.path.isdir(self.path) else []:
+            if not os.path.isdir(os.path.join(self.path, ticker)):
+                continue
+            for name in os.listdir(os.path.join(self.path, ticker)):
+                if name.split(".")[0] not in keys.get(ticker, ()):
+                    os.remove(os.path.join(self.path, ticker, name))
+    
+    IGNORE = {"checkpoint", "cache", "models", "results", "retention", "export", "plot", "daemon", "rank", "horizon", "shard"}
+
+
+# =====================================================
+#  Results Database
+# =====================================================
+class ResultsDB:
+    def __init__(self, file_config="config/config.json"):
+        self.load_config(file_config)
+        
+    def load_config(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+            self.path = config.get("results", {}).get("db", "data/results/results.db")
+            
+    def connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.executescript(self.SCHEMA)
+        return conn
+    
+    def record_run(self, bst_data, preset, **meta):
+        # metrics of all strategies (rank 0: selected) of a run, ranked with preset
+        rows = []
+        for ticker, bst_df in bst_data.items():
+            for rank, row in enumerate(bst_df.itertuples(index=False)):
+                params = "_".join(str(p) for p in row.Parameters)
+                rows.append((ticker, row.Indicator, params, rank, row.Return_Market, row.Return_Strategy, row.Trades, row.Sharpe, row.Max_Drawdown, row.Score))
+        
+        conn = self.connect()
+        try:
+            with conn:
+                cur = conn.execute("INSERT INTO runs (run_date, preset, meta) VALUES (?, ?, ?)",
+                                   (datetime.now().isoformat(timespec="seconds"), preset, json.dumps(meta)))
+                run_id = cur.lastrowid
+                conn.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [(run_id, *row) for row in rows])
+        finally:
+            conn.close()
+        return run_id
+    
+    def latest_strategies(self):
+        # selected strategy of latest run of each ticker (same as Strategies.import_strategies)
+        if not os.path.exists(self.path):
+            return {}
+        conn = self.connect()
+        try:
+            rows = conn.execute("""
+                SELECT r.ticker, r.indicator, r.parameters FROM results r
+                WHERE r.rank = 0 AND r.run_id = (SELECT MAX(run_id) FROM results WHERE ticker = r.ticker)
+                ORDER BY r.ticker
+            """).fetchall()
+        finally:
+            conn.close()
+        return {ticker: {"Indicator": ind_t, "Parameters": params} for ticker, ind_t, params in rows}
+    
+    def history(self, ticker=None, indicator=None, since=None, selected=False):
+        # results of past runs (filtered by ticker, indicator, run date or only selected strategies)
+        filters = {"results.ticker = ?": ticker, "results.indicator = ?": indicator, "runs.run_date >= ?": since}
+        filters = {clause: str(value) for clause, value in filters.items() if value is not None}
+        if selected:
+            filters["results.rank = ?"] = 0
+        query = ["SELECT runs.run_date, runs.preset, results.* FROM results JOIN runs ON runs.id = results.run_id"]
+        if filters:
+            query.append("WHERE " +" AND ".join(filters))
+        query.append("ORDER BY results.run_id, results.ticker, results.rank")
+        
+        conn = self.connect()
+        try:
+            return pd.read_sql_query(" ".join(query), conn, params=list(filters.values()))
+        finally:
+            conn.close()
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, run_date TEXT NOT NULL, preset TEXT, meta TEXT
+        );
+        CREATE TABLE IF NOT EXISTS results (
+            run_id INTEGER NOT NULL REFERENCES runs(id), ticker TEXT NOT NULL, indicator TEXT NOT NULL, parameters TEXT NOT NULL,
+            rank INTEGER NOT NULL, return_market REAL, return_strategy REAL, trades REAL, sharpe REAL, max_drawdown REAL, score REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_runs_date ON runs (run_date);
+        CREATE INDEX IF NOT EXISTS idx_results_ticker ON results (ticker, rank, run_id);
+        CREATE INDEX IF NOT EXISTS idx_results_indicator ON results (indicator, parameters);
+        CREATE INDEX IF NOT EXISTS idx_results_run ON results (run_id);
+    """
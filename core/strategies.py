@@ -1,4 +1,5 @@
-import json
+import json, heapq, itertools
+import numpy as np
 import pandas as pd
 
 
@@ -22,33 +23,22 @@ class Strategies:
             cfg    = config.get("backtest", {})
         self.preset = cfg.get("preset", "basic")
     
-    def best_strategy(self, res_data, **weights):
+    def best_strategy(self, res_data, top_k=None, **weights):
         """
         Manages scoring presets for strategy in a deterministic grid evaluation:
         tests all parameter combinations and ranks them using
         weighted objective scores defined by each preset.
         """
-        bst_data = {}
-
-        params = {**self.PRESET[self.preset], **weights}
-        w_return = params["w_return"]
-        w_trades = params["w_trades"]
-        w_sharpe = params["w_sharpe"]
-        w_drdown = params["w_drdown"]
-        
-        
+        ranking = Ranking({self.preset: {**self.PRESET[self.preset], **weights}}, top_k)
         for ticker, ticker_results in res_data.items():
-            df = pd.DataFrame.from_dict(ticker_results, orient="index")
-            
-            # calculate SCORE (higher is better)
-            df["Score"] = (
-                w_return*df["Return_Strategy"]
-                -w_trades*df["Trades"]
-                +w_sharpe*df["Sharpe"]
-                -w_drdown*df["Max_Drawdown"]
-            )
-            bst_data[ticker] = df.sort_values("Score", ascending=False)
-        return bst_data
+            ranking.extend(ticker, ticker_results.items())
+        return ranking.best(self.preset)
+    
+    def ranking(self, top_k=None, compare=False, **custom):
+        # ranking engine of current preset (all presets when compared, and custom weights: name={"w_return": ...})
+        presets = {self.preset: self.PRESET[self.preset], **(self.PRESET if compare else {})}
+        presets.update({name: {**self.PRESET[self.preset], **w} for name, w in custom.items()})
+        return Ranking(presets, top_k)
     
     def import_strategies(self, csv_file):
         # import strategies
@@ -60,4 +50,54 @@ class Strategies:
         "balanced":  {"w_return": 1.0, "w_trades": 0.04, "w_sharpe": 0.01, "w_drdown": 0.05},
         "agressive": {"w_return": 1.0, "w_trades": 0, "w_sharpe": 0.02, "w_drdown": 0},
         "defensive": {"w_return": 1.0, "w_trades": 0.05, "w_sharpe": 0, "w_drdown": 0.05},
-    }
\ No newline at end of file
+    }
+
+
+# =====================================================
+#  Ranking (streaming scores of several presets)
+# =====================================================
+class Ranking:
+    def __init__(self, presets, top_k=None):
+        # presets: {name: weights}, top_k: best strategies kept for each ticker and preset (None keeps all)
+        self.names = list(presets)
+        self.W     = np.array([[p["w_return"], -p["w_trades"], p["w_sharpe"], -p["w_drdown"]] for p in presets.values()]).T
+        self.top_k = top_k
+        self.heaps = {}                 # {(ticker, preset): [(key, -order, label, result, score)]}
+        self.order = itertools.count()  # insertion order (ties ranked first come, as a stable sort)
+        self.first = {}                 # {ticker: first position} (tickers in grid order, independent of arrival order)
+        
+    def extend(self, ticker, records, order=None):
+        # metric records (label, result) of a ticker: scores of all presets in one matrix product
+        # order: position of each record in grid (ties ranked by it, independent of arrival order)
+        records = list(records)
+        if not records:
+            return
+        order = iter(order) if order is not None else self.order
+        M = np.array([[r["Return_Strategy"], r["Trades"], r["Sharpe"], r["Max_Drawdown"]] for _, r in records], dtype=float)
+        S = M @ self.W
+        K = np.nan_to_num(S, nan=-np.inf)  # undefined scores ranked last
+        for (label, result), scores, keys in zip(records, S, K):
+            k = next(order)
+            self.first[ticker] = min(self.first.get(ticker, k), k)
+            for name, score, key in zip(self.names, scores, keys):
+                heap = self.heaps.setdefault((ticker, name), [])
+                item = (key, -k, label, result, score)
+                if self.top_k is None:
+                    heap.append(item)
+                elif len(heap) < self.top_k:
+                    heapq.heappush(heap, item)
+                else:
+                    heapq.heappushpop(heap, item)
+    
+    def top(self, ticker, preset):
+        # best strategies of ticker sorted by score of preset (same columns as results)
+        items = sorted(self.heaps.get((ticker, preset), []), reverse=True)
+        df = pd.DataFrame.from_dict({label: dict(result) for _, _, label, result, _ in items}, orient="index")
+        df["Score"] = [score for *_, score in items]
+        return df
+    
+    def best(self, preset):
+        return {ticker: self.top(ticker, preset) for ticker in self.tickers() if (ticker, preset) in self.heaps}
+    
+    def tickers(self):
+        return sorted(self.first, key=self.first.get)
@@ -0,0 +1,33 @@
+import zlib
+import numpy as np
+import pandas as pd
+
+
+# =====================================================
+#  Synthetic Market Data
+# =====================================================
+class Synthetic:
+    def __init__(self, n_bars=750, start="2020-01-01", seed=0):
+        self.n_bars = n_bars
+        self.start  = start
+        self.seed   = seed
+        
+    def load_tickers(self, n):
+        return [f"SYN{k:03d}" for k in range(n)]
+    
+    def download_data(self, ticker):
+        # deterministic Close/Volume data for each ticker (no network)
+        rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode())])
+        n   = self.n_bars
+        
+        # geometric random walk with slowly changing drift and volatility regimes
+        drift = np.repeat(rng.normal(0.0003, 0.001, n//50 +1), 50)[:n]
+        vol   = np.repeat(rng.uniform(0.01, 0.03, n//100 +1), 100)[:n]
+        ret   = drift +vol*rng.standard_normal(n)
+        close = rng.uniform(10, 100)*np.exp(np.cumsum(ret))
+        
+        # volume higher on large moves
+        volume = np.round(rng.uniform(1e6, 1e7)*(1 +20*np.abs(ret))*rng.lognormal(0, 0.3, n))
+        
+        index = pd.bdate_range(self.start, periods=n, name="Date")
+        return pd.DataFrame({"Close": close, "Volume": volume}, index=index)
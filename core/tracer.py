@@ -0,0 +1,126 @@
+import os, io, sys, json, time, math, threading, cProfile, pstats, tracemalloc
+import numpy as np
+from contextlib import contextmanager
+
+
+# =====================================================
+#  Tracer
+# =====================================================
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.target  = None         # label of job to profile (cProfile and tracemalloc)
+        self.path    = "data/trace"
+        self.events  = []
+        self.local   = threading.local()
+        
+    def configure(self, enabled=False, profile=None, path="data/trace"):
+        self.enabled = enabled
+        self.target  = profile
+        self.path    = path
+        self.events  = []          # starts a new trace (also in forked workers)
+        
+    @staticmethod
+    def rss():
+        # current resident memory in MB (lifetime peak where /proc is not available, nan without resource on Windows)
+        try:
+            with open("/proc/self/statm", "r") as f:
+                return int(f.read().split()[1])*os.sysconf("SC_PAGE_SIZE")/2**20
+        except (OSError, ValueError, AttributeError):
+            pass
+        try:
+            import resource
+        except ImportError:
+            return math.nan
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak/2**20 if sys.platform == "darwin" else peak/1024     # bytes on macOS, KB elsewhere
+        
+    @contextmanager
+    def span(self, name, **tags):
+        # time a stage (tags are inherited by inner spans)
+        if not self.enabled:
+            yield
+            return
+        parent = getattr(self.local, "tags", {})
+        self.local.tags = {**parent, **tags}
+        rss   = self.rss()
+        start = time.time_ns()
+        try:
+            yield
+        finally:
+            end = time.time_ns()
+            rss_end = self.rss()
+            self.events.append({
+                "name": name, "ph": "X", "ts": start/1000, "dur": (end -start)/1000,
+                "pid": os.getpid(), "tid": threading.get_ident(),
+                "args": {**self.local.tags, "rss_start_mb": rss, "rss_end_mb": rss_end, "rss_delta_mb": rss_end -rss},
+            })
+            self.local.tags = parent
+            
+    @contextmanager
+    def profile(self, label):
+        # cProfile and tracemalloc capture (only for selected label)
+        if self.target is None or label != self.target:
+            yield
+            return
+        profiler = cProfile.Profile()
+        tracemalloc.start()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            
+            os.makedirs(self.path, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.path, f"{label}.prof"))
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(30)
+            out.write("\nTop memory allocations:\n")
+            for stat in snapshot.statistics("lineno")[:20]:
+                out.write(f"{stat}\n")
+            with open(os.path.join(self.path, f"{label}_profile.txt"), "w", encoding="utf-8") as f:
+                f.write(out.getvalue())
+            print(f"Profile saved in {self.path}/{label}_profile.txt")
+            
+    def drain(self):
+        # collected events (cleared, e.g. to send from worker processes)
+        events, self.events = self.events, []
+        return events
+    
+    def extend(self, events):
+        self.events.extend(events)
+        
+    def summary(self):
+        # total and p95 time, largest RSS at end and largest RSS growth of a span for each stage
+        stages = {}
+        for e in self.events:
+            stages.setdefault(e["name"], []).append(e)
+        rows = []
+        for name, events in stages.items():
+            dur = np.array([e["dur"] for e in events])/1e6
+            rss = max(e["args"]["rss_end_mb"] for e in events)
+            delta = max(e["args"]["rss_delta_mb"] for e in events)
+            rows.append((name, len(events), dur.sum(), np.percentile(dur, 95), rss, delta))
+        rows.sort(key=lambda r: r[2], reverse=True)
+        
+        lines = [f"{'Stage':<22}{'Count':>8}{'Total (s)':>12}{'p95 (s)':>12}{'RSS (MB)':>12}{'Max growth (MB)':>18}"]
+        lines += [f"{name:<22}{n:>8}{total:>12.3f}{p95:>12.4f}{rss:>12.1f}{delta:>18.1f}" for name, n, total, p95, rss, delta in rows]
+        return "\n".join(lines)
+    
+    def save(self, name):
+        # Chrome trace (chrome://tracing or Perfetto) and summary table
+        if not self.enabled:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        summary = self.summary()
+        with open(os.path.join(self.path, f"{name}_summary.txt"), "w", encoding="utf-8") as f:
+            f.write(summary +"\n")
+        print(summary)
+        
+
+# tracer shared by all modules (disabled by default)
+tracer = Tracer()
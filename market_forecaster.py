@@ -1,13 +1,222 @@
-import os, itertools, sys, traceback
+import os, itertools, sys, traceback, argparse, json, math, functools, pickle, shutil, hashlib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from core.loader import Loader
-from core.backtester import Backtester
+from core.backtester import Backtester, Result
 from core.forecaster import Forecaster
 from core.strategies import Strategies
 from core.exporter import Exporter
+from core.store import ModelStore, ResultsDB, Checkpoint
+from core.panel import Panel
+from core.tracer import tracer
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
 
-def main():
+# lag matrices cache (for each process): {ticker: (hash of closes, {n_lags: (X, Y)})}
+ftr_data = {}
+
+# relative cost of a job of each method (balance of shards, overridden by shard.cost in config)
+COST = {"ARIMA": 20.0, "GB": 8.0, "RF": 5.0, "ET": 3.0, "RT": 3.0, "KN": 1.0, "RR": 0.5, "LR": 0.5}
+
+
+def init_worker(trace=False, profile=None):
+    # one thread per worker process (avoids oversubscription of cores)
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)
+    tracer.configure(trace, profile)
+    ftr_data.clear()            # starts empty (also in forked workers)
+
+
+def run_traced(fn, *args):
+    # run in worker process and send back its trace events
+    return fn(*args), tracer.drain()
+
+
+def get_features(ticker, df):
+    # lag matrices of ticker shared among its jobs (replaced when its data changed)
+    key = hashlib.sha256(df["Close"].to_numpy(dtype=float).tobytes()).hexdigest()
+    if ftr_data.get(ticker, (None,))[0] != key:
+        ftr_data[ticker] = (key, {})
+    return ftr_data[ticker][1]
+
+
+def get_label(ticker, indicator):
+    ind_t  = indicator["ind_t"]  # indicator title
+    ind_p  = indicator["ind_p"]  # indicator parameters
+    params = "_".join(str(p) for p in ind_p)
+    return f"{ticker}_{ind_t}_{params}"
+
+
+def run_job(ticker, indicators, panel, retain=False, frames=True):
+    # family of nested indicators (model trained once) and backtest of each one (frames streamed to disk unless retained, none if not frames)
+    df      = panel.frame(ticker)
+    labels  = [get_label(ticker, indicator) for indicator in indicators]
+    profile = tracer.target if tracer.target in labels else None
+    results = []
+    
+    with tracer.span("job", ticker=ticker, indicator=", ".join(labels)), tracer.profile(profile):
+        # predictions (lag matrices shared among indicators of same ticker)
+        forecaster = Forecaster(indicators[0], df, features=get_features(ticker, df))
+        dfs = forecaster.predictions_family(indicators)
+        for label, fitted in zip(labels, forecaster.family_fitted):
+            save_fitted(ticker, label, fitted)
+        
+        # metrics of all indicators in one vectorized backtest
+        with tracer.span("run_batch", indicator=", ".join(labels)):
+            metrics = Backtester(df).run_batch([frame["Predicted_Close"] for frame in dfs]).to_dict("records")
+        
+        # backtest dataframes (kept in memory or streamed to disk)
+        for label, indicator, frame, row in zip(labels, indicators, dfs, metrics):
+            results.append((label, Result.from_batch(indicator, row), backtest_frame(ticker, label, indicator, frame, retain) if frames else None))
+    return results
+
+
+def backtest_frame(ticker, label, indicator, df, retain=False):
+    # backtest dataframe of a strategy (kept in memory, else streamed to disk)
+    with tracer.span("backtest", indicator=label):
+        df = Backtester(df).run_strategy(indicator)
+    return df if retain else save_frame(ticker, label, df)
+
+
+def save_frame(ticker, label, df):
+    with tracer.span("save_frame", indicator=label):
+        Exporter().save_frame(ticker, label, df)
+
+
+def save_fitted(ticker, label, fitted):
+    with tracer.span("save_fitted", indicator=label):
+        Exporter().save_fitted(ticker, label, fitted)
+
+
+def run_search(ticker, indicators, panel, eta=3, min_bars=40, keep=3, retain=False, frames=True):
+    # successive halving: evaluate on growing walk-forward slices, keeping the best 1/eta (at least keep) each time
+    df     = panel.frame(ticker)
+    fitted = {}     # trained models (same training data in all slices)
+    N      = Forecaster(indicators[0], df).N
+    bars   = min_bars
+    
+    while True:
+        bars = min(bars, len(df) -N)
+        labels = [get_label(ticker, indicator) for indicator in indicators]
+        dfs    = []
+        with tracer.span("search", ticker=ticker, indicator=f"{len(indicators)} x {bars}"):
+            for label, indicator in zip(labels, indicators):
+                forecaster = Forecaster(indicator, df.iloc[:N +bars], fitted=fitted.get(label))
+                dfs.append(forecaster.predictions())
+                fitted[label] = forecaster.fitted
+            metrics = Backtester(dfs[0]).run_batch([frame["Predicted_Close"] for frame in dfs]).to_dict("records")
+        results = {label: Result.from_batch(indicator, row) for label, indicator, row in zip(labels, indicators, metrics)}
+        
+        if bars == len(df) -N:
+            # backtest dataframes only of final slice (kept in memory or streamed to disk)
+            final = []
+            for label, indicator, frame in zip(labels, indicators, dfs):
+                save_fitted(ticker, label, fitted[label])
+                final.append((label, results[label], backtest_frame(ticker, label, indicator, frame, retain) if frames else None))
+            return final
+        
+        # survivors (scored with current preset)
+        ranked = Strategies().best_strategy({ticker: results})[ticker].index
+        best   = set(ranked[:max(keep, math.ceil(len(indicators)/eta))])
+        indicators = [indicator for indicator in indicators if get_label(ticker, indicator) in best]
+        bars *= eta
+
+
+def run_resumable(job, key, ticker, indicators, panel, retain=False, frames=True):
+    # results of finished job from checkpoint (metric records, dataframes read from disk), else run job and save its checkpoint
+    checkpoint = Checkpoint()
+    records = checkpoint.load(ticker, key)
+    if records is not None:
+        return [(label, result, Exporter().load_frame(ticker, label) if retain else None) for label, result in records]
+    
+    results = job(ticker, indicators, panel, retain=retain, frames=frames)
+    if checkpoint.enabled:
+        if retain:
+            for label, _, frame in results:
+                save_frame(ticker, label, frame)
+        files = [f"data/debug/{ticker}/{label}.{ext}" for label, *_ in results for ext in (("parquet", "pkl") if frames else ("pkl",))]
+        checkpoint.save(ticker, key, [(label, result) for label, result, _ in results], files)
+    return results
+
+
+def rank_job(ranking, ticker, results, position):
+    # stream metric records of a finished job into ranking (ties ranked by grid position)
+    ranking.extend(ticker, [(label, result) for label, result, _ in results], [position[label] for label, *_ in results])
+
+
+def retain_frame(ticker, label, row, df):
+    # backtest dataframe of a ranked strategy from its trained model (predictions without training)
+    indicator = {"ind_t": row["Indicator"], "ind_p": list(row["Parameters"])}
+    with tracer.span("retain", indicator=label):
+        fitted = Exporter().load_fitted(ticker, label)
+        df = Forecaster(indicator, df, features=get_features(ticker, df), fitted=fitted).predictions()
+    return backtest_frame(ticker, label, indicator, df, retain=True)
+
+
+def plot_job(ticker, label, df):
+    with tracer.span("plot", indicator=label):
+        if df is None:
+            df = Exporter().load_frame(ticker, label)
+        Backtester(df).plot_res(label)
+    return label
+
+
+def render_charts(bst_data, pro_data, top_k=None, workers=1):
+    # charts only for the top K strategies of each ticker (all if None) among retained dataframes (retention.top_k at most in top_k mode)
+    jobs = [(ticker, label, pro_data[ticker][label]) for ticker, bst_df in bst_data.items() for label in bst_df.index[:top_k] if label in pro_data[ticker]]
+    
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(tracer.enabled, tracer.target)) as pool:
+            futures = [pool.submit(run_traced, plot_job, *job) for job in jobs]
+            for future in as_completed(futures):
+                tracer.extend(future.result()[1])
+    else:
+        for job in jobs:
+            plot_job(*job)
+
+
+def sweep_job(ticker, bst_df, frames, df, grid):
+    # metrics of ranked strategies of a ticker for each set of backtest parameters (one vectorized backtest)
+    # dataframes read from disk, or built from trained models when not retained (retention.frames top_k)
+    labels = list(bst_df.index)
+    dfs = [retain_frame(ticker, label, bst_df.loc[label], df) if label not in frames else
+           Exporter().load_frame(ticker, label) if frames[label] is None else frames[label] for label in labels]
+    metrics = Backtester(dfs[0]).run_batch([df["Predicted_Close"] for df in dfs], grid)
+    metrics.insert(0, "Label", [labels[k] for k in metrics.pop("Strategy")])
+    return metrics
+
+
+def shard_jobs(jobs, n, cost=None):
+    # deterministic split of jobs in n shards of balanced cost (longest processing time first)
+    cost  = {**COST, **(cost or {})}
+    sizes = [sum(cost.get(indicator["ind_t"], 1.0) for indicator in family) for _, family in jobs]
+    load, shards = [0.0]*n, [[] for _ in range(n)]
+    for k in sorted(range(len(jobs)), key=lambda k: (-sizes[k], k)):
+        i = min(range(n), key=lambda i: (load[i], i))
+        load[i] += sizes[k]
+        shards[i].append(k)
+    return [sorted(shard) for shard in shards]
+
+
+def save_shard(path, res_data, pro_data, **meta):
+    # partial results and dataframes of a shard (merged with --merge)
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+    for ticker, ticker_debug in pro_data.items():
+        os.makedirs(os.path.join(path, "debug", ticker), exist_ok=True)
+        for label, df in ticker_debug.items():
+            if df is not None:
+                df.to_parquet(os.path.join(path, "debug", ticker, f"{label}.parquet"))
+            for ext in ("parquet", "pkl") if df is None else ("pkl",):
+                if os.path.exists(f"data/debug/{ticker}/{label}.{ext}"):
+                    shutil.move(f"data/debug/{ticker}/{label}.{ext}", os.path.join(path, "debug", ticker, f"{label}.{ext}"))
+    with open(os.path.join(path, "results.pkl"), "wb") as f:
+        pickle.dump(res_data, f)
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def main(workers=1, plot=None, search=None, shard=None, sweep=False):
     # load config, tickers and ML indicators
     loader = Loader("config/config.json", "config/tickers.json", "config/indicators.json")
 
@@ -15,78 +224,254 @@ def main():
     tickers    = loader.load_tickers()
     indicators = loader.load_indicators()
     
+    with open("config/config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    search = search or config.get("search", {}).get("mode", "grid")
+    frames = config.get("retention", {}).get("frames", "disk")
+    retain = frames == "memory"     # keep all dataframes in memory (else streamed to disk, or only top K built after ranking)
+    
     # initialize cache dictionaries
     raw_data = {}
     pro_data = {}
     res_data = {}
 
     try:
-        # download data and run backtest (for each ticker and strategy)
+        # download data (only once for each ticker)
+        for ticker in tickers:
+            with tracer.span("load", ticker=ticker):
+                raw_data[ticker] = loader.download_data(ticker)
+        
+        # shared read-only panel (views instead of copies of data, also in worker processes)
+        panel    = Panel.build(raw_data)
+        raw_data = {ticker: panel.frame(ticker) for ticker in tickers}
+        
+        # jobs: families of nested indicators, or all indicators in successive halving (for each ticker)
+        if search == "halving":
+            cfg  = config.get("search", {})
+            job  = functools.partial(run_search, eta=cfg.get("eta", 3), min_bars=cfg.get("min_bars", 40), keep=cfg.get("keep", 3))
+            jobs = [(ticker, indicators) for ticker in tickers]
+        else:
+            job  = run_job
+            jobs = list(itertools.product(tickers, Forecaster.families(indicators)))
+        
+        # checkpoint of each job (finished jobs of unchanged data and config are not run again)
+        # jobs of top_k retention write no dataframes: their checkpoints are not served to other modes
+        checkpoint = Checkpoint()
+        keys = [checkpoint.key(raw_data[ticker], search, family, frames != "top_k") for ticker, family in jobs]
+        
+        # jobs of this shard only (i of n)
+        todo = list(range(len(jobs)))
+        if shard is not None:
+            i, n = shard
+            todo = shard_jobs(jobs, n, config.get("shard", {}).get("cost"))[i -1]
+        
+        # ranking of strategies (scored as jobs finish, best top_k kept for each preset)
+        cfg      = config.get("rank", {})
+        ranking  = Strategies().ranking(cfg.get("top_k"), cfg.get("compare", False))
+        position = {get_label(ticker, indicator): k for k, (ticker, indicator) in enumerate(itertools.product(tickers, indicators))}
+        
+        # run predictions and backtest (for each ticker and strategy)
+        if workers > 1:
+            results = {}
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(tracer.enabled, tracer.target)) as pool:
+                futures = {pool.submit(run_traced, run_resumable, job, keys[k], *jobs[k], panel, retain, frames != "top_k"): k for k in todo}
+                
+                # stream results as they finish
+                for n_done, future in enumerate(as_completed(futures), 1):
+                    results[futures[future]], events = future.result()
+                    tracer.extend(events)
+                    rank_job(ranking, jobs[futures[future]][0], results[futures[future]], position)
+                    print(f"[{n_done}/{len(todo)}] {', '.join(label for label, *_ in results[futures[future]])}")
+        else:
+            results = {}
+            for k in todo:
+                results[k] = run_resumable(job, keys[k], *jobs[k], panel, retain, frames != "top_k")
+                rank_job(ranking, jobs[k][0], results[k], position)
+        
+        # store in grid order (rankings independent of completion order)
+        done = {label: (result, df) for job in results.values() for label, result, df in job}
         for ticker, indicator in itertools.product(tickers, indicators):
+            label = get_label(ticker, indicator)
+            if label not in done:
+                continue
+            res_data.setdefault(ticker, {})[label], pro_data.setdefault(ticker, {})[label] = done[label]
+        
+        # removes checkpoints of jobs no longer in grid
+        checkpoint.prune({ticker: {key for (t, _), key in zip(jobs, keys) if t == ticker} for ticker in tickers})
+        
+        if shard is None:
+            finish(config, ranking, pro_data, raw_data, search, plot, workers, sweep)
+        else:
+            # partial results of shard (ranking and exports after merge)
+            with tracer.span("save_shard"):
+                save_shard(f"data/shards/{i}-{n}", res_data, pro_data, shard=i, shards=n, search=search, jobs=len(todo))
+        
+        # saves trace and summary of stages
+        tracer.save(f"optimizer_{datetime.now():%Y%m%d_%H%M%S}" +("" if shard is None else f"_shard{i}-{n}"))
+        
+    except Exception as err:
+        tb = traceback.format_exc()
+        print(f"Fatal error in main: {err}\n{tb}.")
+        raise
+    
+    finally:
+        ftr_data.clear()        # lag matrices are views of the panel
+        if "panel" in locals():
+            panel.close()
 
-            # download data (only once)
-            if ticker not in raw_data:
-                raw_data[ticker] = loader.download_data(ticker)
-            df = raw_data[ticker]
-
-            # predictions
-            df = Forecaster(indicator, df).predictions()
-            
-            # run backtest
-            backtest = Backtester(df)
-            df = backtest.run_strategy(indicator)
-            
-            if ticker not in res_data:
-                res_data[ticker] = {}
-                pro_data[ticker] = {}
-
-            # store processed data and result data
-            ind_t  = indicator["ind_t"]  # indicator title
-            ind_p  = indicator["ind_p"]  # indicator parameters
-            params = "_".join(str(p) for p in ind_p)
-            label  = f"{ticker}_{ind_t}_{params}"
-        
-            pro_data[ticker][label] = df.copy()
-            res_data[ticker][label] = {
-                "Indicator": ind_t,
-                "Parameters": ind_p,
-                "Return_Market": df["Cumulative_Market"].iloc[-1],
-                "Return_Strategy": df["Cumulative_Strategy"].iloc[-1],
-                "Trades": df["Cumulative_Trades"].iloc[-1]//2,
-                "Sharpe": df["Strategy"].mean()/df["Strategy"].std()*pow(len(df["Strategy"]), 0.5),
-                "Max_Drawdown": abs(df["Drawdown"].min()),
-                "Score": 0
-            }
-            backtest.plot_res(label)
-
-        # compute best strategies (for each ticker)
-        bst_data = Strategies().best_strategy(res_data)
 
+def merge(workers=1, plot=None, sweep=False, path="data/shards"):
+    # combine results of all shards (same ranking and exports as a single run)
+    loader = Loader("config/config.json", "config/tickers.json", "config/indicators.json")
+    tickers    = loader.load_tickers()
+    indicators = loader.load_indicators()
+    
+    with open("config/config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    
+    # partial results of each shard
+    shards = {}
+    for name in sorted(os.listdir(path)) if os.path.isdir(path) else []:
+        if os.path.exists(os.path.join(path, name, "results.pkl")):
+            with open(os.path.join(path, name, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            shards[meta["shard"]] = (os.path.join(path, name), meta)
+    n = {meta["shards"] for _, meta in shards.values()}
+    if len(n) != 1 or set(shards) != set(range(1, max(n) +1)):
+        raise ValueError(f"Incomplete or mixed shards in {path}: {sorted(shards)} of {sorted(n)}.")
+    
+    done = {}
+    for shard_path, meta in shards.values():
+        with open(os.path.join(shard_path, "results.pkl"), "rb") as f:
+            for ticker, ticker_results in pickle.load(f).items():
+                os.makedirs(f"data/debug/{ticker}", exist_ok=True)
+                for label, result in ticker_results.items():
+                    for ext in ("parquet", "pkl"):
+                        if os.path.exists(os.path.join(shard_path, "debug", ticker, f"{label}.{ext}")):
+                            shutil.copyfile(os.path.join(shard_path, "debug", ticker, f"{label}.{ext}"), f"data/debug/{ticker}/{label}.{ext}")
+                    done[label] = result
+    search = meta["search"]
+    
+    # rank in grid order (as a single run)
+    cfg      = config.get("rank", {})
+    ranking  = Strategies().ranking(cfg.get("top_k"), cfg.get("compare", False))
+    pro_data, raw_data = {}, {}
+    for k, (ticker, indicator) in enumerate(itertools.product(tickers, indicators)):
+        label = get_label(ticker, indicator)
+        if label not in done:
+            continue
+        ranking.extend(ticker, [(label, done[label])], [k])
+        pro_data.setdefault(ticker, {})[label] = None
+    for ticker in pro_data:
+        with tracer.span("load", ticker=ticker):
+            raw_data[ticker] = loader.download_data(ticker)
+    
+    finish(config, ranking, pro_data, raw_data, search, plot, workers, sweep)
+    tracer.save(f"optimizer_{datetime.now():%Y%m%d_%H%M%S}_merge")
+
+
+def finish(config, ranking, pro_data, raw_data, search, plot=None, workers=1, sweep=False):
+    # best strategies, charts, exports and models of best strategies
+    export = config.get("export", {})
+    
+    # best strategies of current preset (for each ticker)
+    preset = Strategies().preset
+    with tracer.span("rank"):
+        bst_data = ranking.best(preset)
+    
+    # dataframes only of top K strategies of each ticker, built from their trained models (retention.frames top_k)
+    retention = config.get("retention", {})
+    if retention.get("frames") == "top_k":
+        pro_data = {ticker: {label: retain_frame(ticker, label, row, raw_data[ticker]) for label, row in bst_df.iloc[:retention.get("top_k", 3)].iterrows()}
+                    for ticker, bst_df in bst_data.items()}
+    
+    # render charts (after ranking)
+    top_k = config.get("plot", {}).get("top_k", 3) if plot is None else plot
+    render_charts(bst_data, pro_data, None if top_k == "all" else int(top_k), workers)
+
+    exporter = Exporter()
+    if export.get("format", "excel") == "parquet":
+        # exports dataframes and backtesting results sorted by best (Parquet tables)
+        with tracer.span("export_tables"):
+            exporter.export_frames(pro_data)
+            exporter.export_results(bst_data)
+        
+        # spreadsheets from tables (optional)
+        if export.get("excel", False):
+            with tracer.span("export_excel"):
+                exporter.export_excel(list(bst_data))
+    else:
         # exports dataframe for analysis
-        exporter = Exporter()
-        exporter.export_dataframe(pro_data)
+        with tracer.span("export_dataframe"):
+            exporter.export_dataframe(pro_data)
 
         # exports backtesting results sorted by best
-        exporter.export_best_results(bst_data)
+        with tracer.span("export_best_results"):
+            exporter.export_best_results(bst_data)
 
-        # updates best strategies
+    # updates best strategies
+    with tracer.span("update_best_results"):
         exporter.update_best_results(bst_data)
-        
-    except Exception as err:
-        tb = traceback.format_exc()
-        print(f"Fatal error in main: {err}\n{tb}.")
-        sys.exit(1)
+    
+    # best strategies of each preset (comparison)
+    if config.get("rank", {}).get("compare", False):
+        with tracer.span("export_presets"):
+            exporter.export_presets(ranking)
+    
+    # sensitivity of best strategies to hysteresis, persistence and volume_ma (optional)
+    cfg = config.get("backtest", {}).get("sweep", {})
+    if sweep or cfg.get("enabled", False):
+        grid = {key: cfg[key] for key in ("hysteresis", "persistence", "volume_ma") if key in cfg}
+        with tracer.span("sweep"):
+            exporter.export_sweep({ticker: sweep_job(ticker, bst_df.iloc[:cfg.get("top_k")], pro_data[ticker], raw_data[ticker], grid) for ticker, bst_df in bst_data.items()})
+    
+    # records metrics of all strategies and selected ones (history of runs)
+    with tracer.span("record_run"):
+        ResultsDB().record_run(bst_data, preset, search=search, tickers=ranking.tickers())
+    
+    # saves models of best strategies trained in the grid (for use in main_bot), retrained only when not on disk
+    store = ModelStore()
+    for ticker, bst_df in bst_data.items():
+        indicator  = {"ind_t": bst_df.iloc[0]["Indicator"], "ind_p": list(bst_df.iloc[0]["Parameters"])}
+        with tracer.span("save_model", ticker=ticker):
+            fitted     = exporter.load_fitted(ticker, bst_df.index[0])
+            forecaster = Forecaster(indicator, raw_data[ticker], features=get_features(ticker, raw_data[ticker]), fitted=fitted)
+            forecaster.predictions()
+            forecaster.fit_horizon()
+            store.save(ticker, indicator, forecaster)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest and select best strategies.")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes (1 runs serially)")
+    parser.add_argument("--plot", default=None, help="charts for top K strategies of each ticker, or 'all' (default from config)")
+    parser.add_argument("--search", default=None, choices=["grid", "halving"], help="exhaustive grid or successive halving (default from config)")
+    parser.add_argument("--trace", action="store_true", help="save trace (data/trace) and summary of each stage")
+    parser.add_argument("--profile", default=None, help="cProfile and tracemalloc capture of one job (e.g. PETR4_RF_50_5_5)")
+    parser.add_argument("--shard", default=None, help="run only shard i of n (e.g. 2/4), results saved in data/shards/i-n")
+    parser.add_argument("--merge", action="store_true", help="combine results of all shards in data/shards (ranking and exports)")
+    parser.add_argument("--sweep", action="store_true", help="backtest best strategies over the hysteresis, persistence and volume_ma grid of backtest.sweep (data/results/sweep.csv)")
+    args = parser.parse_args()
+    tracer.configure(args.trace, args.profile)
+    
+    shard = None
+    if args.shard:
+        shard = tuple(int(v) for v in args.shard.split("/"))
+        if len(shard) != 2 or not 1 <= shard[0] <= shard[1]:
+            parser.error(f"invalid shard: {args.shard} (expected i/n with 1 <= i <= n)")
+    
     max_attempt = 3
     
     for attempt in range(1, max_attempt+1):
         try:
             print(f"Attempt {attempt} of {max_attempt}.")
-            main()
+            if args.merge:
+                merge(args.workers, args.plot, args.sweep)
+            else:
+                main(args.workers, args.plot, args.search, shard, args.sweep)
             break
         except Exception as err:
             print(f"Error on attempt {attempt}: {err}.")
             if attempt == max_attempt:
-                print("All attempts failed.")
\ No newline at end of file
+                print("All attempts failed.")
+                sys.exit(1)
@@ -0,0 +1,171 @@
+import os, sys, json, time, shutil, argparse, tempfile, tracemalloc, resource, itertools, subprocess
+from datetime import datetime
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+import numpy as np
+import market_forecaster
+from core.loader import Loader
+from core.synthetic import Synthetic
+from core.backtester import Backtester
+from core.forecaster import Forecaster
+from core.strategies import Strategies
+from core.exporter import Exporter
+from core.panel import Panel
+
+
+ROOT = os.getcwd()
+
+
+def measure(fn, repeat=1, memory=True):
+    # wall time (best of repeat) and peak of traced memory (separate run)
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() -t)
+    res = {"time": min(times)}
+    if memory:
+        tracemalloc.start()
+        fn()
+        res["peak_mb"] = tracemalloc.get_traced_memory()[1]/2**20
+        tracemalloc.stop()
+    return res
+
+
+def workspace(path, args):
+    # config and synthetic data (offline cache) in a temporary directory
+    shutil.copytree(os.path.join(ROOT, "config"), os.path.join(path, "config"))
+    for d in ["debug", "results", "cache", "models", "state"]:
+        os.makedirs(os.path.join(path, "data", d), exist_ok=True)
+    
+    with open(os.path.join(path, "config/config.json"), "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config.update(start="2000-01-01", end="2100-01-01", cache={"dir": "data/cache", "offline": True}, checkpoint={"enabled": False})
+    with open(os.path.join(path, "config/config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    
+    synthetic  = Synthetic(args.bars, seed=args.seed)
+    tickers    = synthetic.load_tickers(args.tickers)
+    indicators = Loader(os.path.join(path, "config/config.json"), file_indicators=os.path.join(path, "config/indicators.json")).load_indicators()
+    indicators = list(itertools.islice(itertools.cycle(indicators), args.indicators))
+    for ticker in tickers:
+        synthetic.download_data(ticker).to_parquet(os.path.join(path, "data/cache", f"{ticker}.parquet"))
+    with open(os.path.join(path, "config/tickers.json"), "w", encoding="utf-8") as f:
+        json.dump({"tickers": tickers}, f)
+    with open(os.path.join(path, "config/indicators.json"), "w", encoding="utf-8") as f:
+        json.dump({"indicators": indicators}, f)
+    return tickers, indicators
+
+
+# cold start of bot: imports and one model (new interpreter)
+STARTUP = "from core.loader import Loader; from core.forecaster import Forecaster; from core.backtester import Backtester; from core.store import ModelStore; Forecaster.MODELS['RF']([50, 5, 5])"
+
+
+def startup():
+    subprocess.run([sys.executable, "-c", STARTUP], cwd=ROOT, check=True)
+
+
+def run(args):
+    stages = {}
+    def stage(name, fn, repeat=args.repeat):
+        stages[name] = measure(fn, repeat, not args.no_memory)
+        print(f"{name:<24} {stages[name]['time']:9.4f} s {stages[name].get('peak_mb', float('nan')):9.1f} MB")
+        
+    stage("startup", startup)
+    
+    with tempfile.TemporaryDirectory() as path:
+        tickers, indicators = workspace(path, args)
+        os.chdir(path)
+        try:
+            loader = Loader("config/config.json", "config/tickers.json", "config/indicators.json")
+            stage("load", lambda: [loader.download_data(ticker) for ticker in tickers])
+            df = loader.download_data(tickers[0])
+            
+            # forecasting (each model type)
+            for method in Forecaster.MODELS:
+                indicator = next((i for i in indicators if i["ind_t"] == method), {"ind_t": method, "ind_p": [50, 5, 5]})
+                try:
+                    stage(f"forecast_{method}", lambda: Forecaster(indicator, df).predictions())
+                except Exception as err:
+                    print(f"forecast_{method:<15} failed: {err}")
+            
+            # backtest (single and batched)
+            indicator = indicators[0]
+            pred = Forecaster(indicator, df).predictions()
+            stage("run_strategy", lambda: Backtester(pred).run_strategy(indicator))
+            P = np.vstack([pred["Predicted_Close"].to_numpy()]*len(indicators))
+            stage("run_batch", lambda: Backtester(pred).run_batch(P))
+            
+            # ranking and export (results of full grid)
+            res_data, pro_data = {}, {}
+            panel = Panel.build({ticker: loader.download_data(ticker) for ticker in tickers}, os.path.join(path, "panel"))
+            stage("panel", lambda: Panel.build({ticker: loader.download_data(ticker) for ticker in tickers}, os.path.join(path, "panel_bench")).close())
+            for ticker, family in itertools.product(tickers, Forecaster.families(indicators)):
+                for label, result, frame in market_forecaster.run_job(ticker, family, panel):
+                    res_data.setdefault(ticker, {})[label] = result
+                    pro_data.setdefault(ticker, {})[label] = frame
+            bst_data = Strategies().best_strategy(res_data)
+            exporter = Exporter()
+            stage("best_strategy", lambda: Strategies().best_strategy(res_data))
+            stage("export_dataframe", lambda: exporter.export_dataframe(pro_data), 1)
+            stage("export_best_results", lambda: exporter.export_best_results(bst_data))
+            stage("update_best_results", lambda: exporter.update_best_results(bst_data))
+            stage("export_tables", lambda: (exporter.export_frames(pro_data), exporter.export_results(bst_data)), 1)
+            stage("export_excel", lambda: exporter.export_excel(list(bst_data)), 1)
+            
+            # end-to-end (full grid)
+            stage("grid", lambda: market_forecaster.main(args.workers), 1)
+        finally:
+            os.chdir(ROOT)
+            
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "params": {"bars": args.bars, "tickers": args.tickers, "indicators": args.indicators, "workers": args.workers, "seed": args.seed},
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024,
+        "stages": stages,
+    }
+
+
+def compare(res, base, tolerance, min_time=0.05):
+    # regressions: slower (or larger) than baseline beyond tolerance
+    failed = []
+    if res["params"] != base["params"]:
+        print(f"Warning: baseline parameters differ {base['params']}.")
+    for name, cur in res["stages"].items():
+        ref = base["stages"].get(name)
+        if ref is None:
+            continue
+        for key, floor in [("time", min_time), ("peak_mb", 1.0)]:
+            if key in cur and key in ref and cur[key] > ref[key]*(1 +tolerance) and cur[key] -ref[key] > floor:
+                failed.append(name)
+                print(f"Regression in {name} ({key}): {ref[key]:.4f} -> {cur[key]:.4f}")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic data.")
+    parser.add_argument("--bars", type=int, default=750, help="samples for each ticker")
+    parser.add_argument("--tickers", type=int, default=2, help="number of tickers")
+    parser.add_argument("--indicators", type=int, default=8, help="number of indicators (cycled from indicators.json)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for the end-to-end grid")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions for each stage (best time)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of synthetic data")
+    parser.add_argument("--no-memory", action="store_true", help="skip peak memory measurement")
+    parser.add_argument("--baseline", default="data/bench/baseline.json", help="baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="save results as baseline")
+    parser.add_argument("--compare", action="store_true", help="fail on regressions against baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args()
+    
+    res = run(args)
+    os.makedirs("data/bench", exist_ok=True)
+    with open(f"data/bench/bench_{res['date'].replace(':', '')}.json", "w", encoding="utf-8") as f:
+        json.dump(res, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    if args.compare:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        if compare(res, base, args.tolerance):
+            sys.exit(1)
+        print("No regressions.")
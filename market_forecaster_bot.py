@@ -1,18 +1,38 @@
-import os
+import os, argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from core.loader import Loader
-from core.backtester import Backtester
-from core.forecaster import Forecaster
 from core.strategies import Strategies
+from core.live import LiveTicker
 from core.notifier import Notifier
+from core.store import ModelStore, ResultsDB
+from core.tracer import tracer
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
 
-# import best strategies from strategies.csv: tickers, indicators
+# import best strategies from local results database (else strategies.csv): tickers, indicators
 #csv_file   = "data/results/strategies.csv"
 csv_file   = "https://drive.google.com/uc?export=download&id=1Ng0WSH98csTZMaUCLfEKV9sBWdDhajVl"
-strategies = Strategies().import_strategies(csv_file)
+strategies = ResultsDB().latest_strategies() or Strategies().import_strategies(csv_file)
 tickers    = list(strategies.keys())
 notifier   = Notifier()
+store      = ModelStore()
+
+
+def run_ticker(ticker):
+    # strategy
+    ind_t     = strategies[ticker]["Indicator"]
+    ind_p     = strategies[ticker]["Parameters"]
+    indicator = {"ind_t": ind_t, "ind_p": [int(p) for p in ind_p.split("_")]}
+    
+    # download data
+    loader = Loader("config/config.json", "config/tickers.txt", "config/indicators.txt")
+    with tracer.span("load"):
+        df = loader.download_data(ticker)
+    
+    # trained model (retrain when stale), predictions and incremental backtest: last values and forecast
+    return LiveTicker(ticker, indicator, df, store).alert()
+
 
 def main():
     # initialize lists
@@ -22,78 +42,42 @@ def main():
     # run for each ticker
     for ticker in tickers:
         print(f"Processing {ticker}")
-        
-        # strategy
-        ind_t     = strategies[ticker]["Indicator"]
-        ind_p     = strategies[ticker]["Parameters"]
-        params    = ind_p.split("_")
-        indicator = {"ind_t": ind_t, "ind_p": [int(p) for p in params]}
-        
-        # download and backtest
-        loader = Loader("config/config.json", "config/tickers.txt", "config/indicators.txt")
-        df = loader.download_data(ticker)
-        forecaster = Forecaster(indicator, df)
-        df = forecaster.predictions()
-        df = Backtester(df).run_strategy(indicator)
-
-        # obtain last values: closing price, signal, signal length, volume strength, entry price, forecast
-        last_clo = df["Close"].iloc[-1]
-        last_sig = df["Signal"].iloc[-1]
-        last_str = df["Signal_Length"].iloc[-1]
-        last_vol = df["Volume_Strength"].iloc[-1]
-        last_ent = df["Entry_Price"].iloc[-1]
-        last_for = forecaster.predict_next()
-
-        # store report
-        alerts.append({
-            "Ticker": ticker,
-            "Indicator": ind_t,
-            "Parameters": params,
-            "Close": float(last_clo),
-            "Signal": int(last_sig),
-            "Signal_Length": int(last_str),
-            "Volume_Strength": float(last_vol),
-            "Entry_Price": float(last_ent),
-            "Predicted_Close": float(last_for)
-        })
+        with tracer.span("ticker", ticker=ticker), tracer.profile(ticker):
+            alerts.append(run_ticker(ticker))
     
-    messages = {}
+    # trading messages
     for a in alerts:
-        # define signal
-        if a["Signal"] != 0:       
-            verb = "⬆️ BUY" if a["Signal"] == 1 else "⬇️ SELL"
-        else:
-            verb = "⏸️ NEUTRAL"
+        report.append(notifier.alert_message(a))
+    
+    # report in E-mail (sent while Telegram messages are sent)
+    with ThreadPoolExecutor(max_workers=1) as pool, tracer.span("notify"):
+        pool.submit(notifier.send_email, subject="Market Forecaster - Daily Report", body="\n\n".join(report))
         
-        # trading message
-        msg = (f"#{a['Ticker']} | {verb} ({a['Indicator']}{'/'.join(a['Parameters'])}) Duration {a['Signal_Length']:d} | Price R$ {a['Close']:.2f}\n"
-               f"Volume Strength: {a['Volume_Strength']:.2f}\n"
-               f"Entry Price: R$ {a['Entry_Price']:.2f}\n"
-               f"Predicted Price: R$ {a['Predicted_Close']:.2f}")
-        report.append(msg)
-
-        # notifies via Telegram
+        # notifies via Telegram (concurrent, rate limited)
+        msg_ids  = notifier.send_telegram_many(report)
+        messages = {a["Ticker"]: msg_id for a, msg_id in zip(alerts, msg_ids) if msg_id is not None}
+    
+        # summary in Telegram
         try:
-            msg_id = notifier.send_telegram(msg)
-            messages[a["Ticker"]] = msg_id
+            summary = []
+            for ticker, msg_id in messages.items():
+                link = f"https://t.me/{notifier.CHAT_ID.lstrip('@')}/{msg_id}"
+                summary.append(f'<a href="{link}">{ticker}</a>')
+            msg   =  " ○ ".join(summary)
+            notifier.send_telegram(msg)
+            
         except Exception as err:
             print("Telegram error:", err)
+    notifier.close()
     
-    # summary in Telegram
-    try:
-        summary = []
-        for ticker, msg_id in messages.items():
-            link = f"https://t.me/{notifier.CHAT_ID.lstrip('@')}/{msg_id}"
-            summary.append(f'<a href="{link}">{ticker}</a>')
-        msg   =  " ○ ".join(summary)
-        notifier.send_telegram(msg)
-        
-    except Exception as err:
-        print("Telegram error:", err)
-
-    # report in E-mail
-    notifier.send_email(subject="Market Forecaster - Daily Report", body="\n\n".join(report))
+    # saves trace and summary of stages
+    tracer.save(f"bot_{datetime.now():%Y%m%d_%H%M%S}")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trading signals of best strategies.")
+    parser.add_argument("--trace", action="store_true", help="save trace (data/trace) and summary of each stage")
+    parser.add_argument("--profile", default=None, help="cProfile and tracemalloc capture of one ticker (e.g. PETR4)")
+    args = parser.parse_args()
+    tracer.configure(args.trace, args.profile)
     main()
\ No newline at end of file
@@ -0,0 +1,122 @@
+import os, json, time, shutil, argparse, threading, traceback
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pandas as pd
+from core.loader import Loader
+from core.strategies import Strategies
+from core.live import LiveTicker
+from core.notifier import Notifier
+from core.store import ModelStore, ResultsDB
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+
+# best strategies from local results database (else strategies.csv), as in main_bot
+csv_file = "https://drive.google.com/uc?export=download&id=1Ng0WSH98csTZMaUCLfEKV9sBWdDhajVl"
+
+# warm models and backtest states {ticker: LiveTicker}, shared with the metrics server
+live    = {}
+lock    = threading.Lock()
+started = time.time()
+
+
+def load_live(strategies):
+    # one download and model load for each ticker (kept in memory afterwards)
+    loader = Loader("config/config.json", "config/tickers.json", "config/indicators.json")
+    store  = ModelStore()
+    for ticker, strategy in strategies.items():
+        indicator = {"ind_t": strategy["Indicator"], "ind_p": [int(p) for p in str(strategy["Parameters"]).split("_")]}
+        try:
+            live[ticker] = LiveTicker(ticker, indicator, loader.download_data(ticker), store)
+            print(f"Loaded {ticker} ({indicator['ind_t']}, last bar {live[ticker].state.date})")
+        except Exception as err:
+            print(f"Load fail for {ticker}: {err}")
+
+
+def read_bars(path):
+    # new bars of a ticker: file {ticker}.csv or {ticker}_{suffix}.csv with columns Date, Close, Volume (others ignored)
+    bars = pd.read_csv(path, parse_dates=["Date"], index_col="Date")
+    return bars.sort_index()
+
+
+def scan(feed, notifier=None):
+    # process files in feed directory (oldest first), then move them to done/ (or failed/)
+    entries = sorted((e for e in os.scandir(feed) if e.is_file() and e.name.endswith(".csv")), key=lambda e: e.stat().st_mtime)
+    for entry in entries:
+        arrival = time.perf_counter()
+        ticker  = entry.name[:-4].split("_")[0]
+        target  = "done"
+        try:
+            if ticker not in live:
+                raise ValueError(f"Unknown ticker: {ticker}.")
+            with lock:
+                alert = live[ticker].update(read_bars(entry.path), arrival)
+            msg = Notifier.alert_message(alert)
+            print(f"[{datetime.now():%H:%M:%S}] {msg.splitlines()[0]} ({live[ticker].latency[-1]*1000:.1f} ms)")
+            if notifier:
+                notifier.send_telegram(msg)
+        except Exception as err:
+            print(f"Feed fail for {entry.name}: {err}")
+            target = "failed"
+        os.makedirs(os.path.join(feed, target), exist_ok=True)
+        shutil.move(entry.path, os.path.join(feed, target, entry.name))
+    return len(entries)
+
+
+class Handler(BaseHTTPRequestHandler):
+    # /health: status and tickers loaded; /metrics: bars, signal and latency of each ticker
+    def do_GET(self):
+        with lock:
+            if self.path == "/health":
+                body = {"status": "ok" if live else "empty", "uptime_s": round(time.time() -started, 1), "tickers": sorted(live)}
+            elif self.path == "/metrics":
+                body = {ticker: worker.metrics() for ticker, worker in live.items()}
+            else:
+                self.send_error(404)
+                return
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def main(feed, port, poll, notify=False):
+    strategies = ResultsDB().latest_strategies() or Strategies().import_strategies(csv_file)
+    load_live(strategies)
+    notifier = Notifier() if notify else None
+
+    # health and metrics endpoint (background thread)
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Watching {feed} (metrics on http://127.0.0.1:{server.server_port}/metrics)")
+
+    os.makedirs(feed, exist_ok=True)
+    try:
+        while True:
+            try:
+                scan(feed, notifier)
+            except Exception as err:
+                print(f"Scan fail: {err}\n{traceback.format_exc()}")
+            time.sleep(poll)
+    except KeyboardInterrupt:
+        print("Stopped.")
+    finally:
+        server.shutdown()
+        if notifier:
+            notifier.close()
+
+
+if __name__ == "__main__":
+    with open("config/config.json", "r", encoding="utf-8") as f:
+        cfg = json.load(f).get("daemon", {})
+    parser = argparse.ArgumentParser(description="Service with warm models: trading signals of new bars dropped in a feed directory.")
+    parser.add_argument("--feed", default=cfg.get("feed", "data/feed"), help="directory watched for new bars ({ticker}_*.csv)")
+    parser.add_argument("--port", type=int, default=cfg.get("port", 8765), help="port of /health and /metrics endpoints")
+    parser.add_argument("--poll", type=float, default=cfg.get("poll", 0.05), help="seconds between scans of feed directory")
+    parser.add_argument("--notify", action="store_true", help="send each signal via Telegram")
+    args = parser.parse_args()
+    main(args.feed, args.port, args.poll, args.notify)
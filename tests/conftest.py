@@ -0,0 +1,31 @@
+import json
+import numpy as np
+import pytest
+from core.synthetic import Synthetic
+
+
+@pytest.fixture
+def config(tmp_path):
+    # small training window and default backtest parameters
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({
+        "N_train": 60,
+        "horizon": 1,
+        "walk_forward": {"refit_every": 0},
+        "backtest": {"persistence": 2, "hysteresis": 0.5, "volume_ma": 10},
+    }))
+    return str(path)
+
+
+@pytest.fixture
+def market():
+    return Synthetic(n_bars=160, seed=1).download_data("AAA")
+
+
+@pytest.fixture
+def predictions(market):
+    # noisy forecasts of next closes (none during training samples, as in Forecaster)
+    rng  = np.random.default_rng(0)
+    pred = market["Close"].to_numpy()*(1 +rng.normal(0, 0.01, (6, len(market))))
+    pred[:, :60] = np.nan
+    return pred
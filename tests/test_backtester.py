@@ -0,0 +1,66 @@
+import pytest
+from core.backtester import Backtester, Result
+
+METRICS = ["Return_Market", "Return_Strategy", "Trades", "Sharpe", "Max_Drawdown"]
+
+
+def frames(market, predictions):
+    return [market.assign(Predicted_Close=pred) for pred in predictions]
+
+
+def test_run_batch_matches_run_strategy(config, market, predictions):
+    indicator = {"ind_t": "RF", "ind_p": [50, 5, 5]}
+    batch = Backtester(market, config).run_batch(predictions)
+    for df, row in zip(frames(market, predictions), batch.to_dict("records")):
+        df = Backtester(df, config).run_strategy(indicator)
+        expected, result = Result.from_frame(indicator, df), Result.from_batch(indicator, row)
+        for key in METRICS:
+            assert result[key] == pytest.approx(expected[key], rel=1e-12)
+        assert row["Signal"] == df["Signal"].iloc[-1]
+        assert row["Signal_Length"] == df["Signal_Length"].iloc[-1]
+        assert row["Entry_Price"] == pytest.approx(df["Entry_Price"].iloc[-1], nan_ok=True)
+        assert row["Volume_Strength"] == pytest.approx(df["Volume_Strength"].iloc[-1])
+
+
+def test_run_batch_grid_matches_run_strategy(config, market, predictions):
+    grid  = {"hysteresis": [0.0, 1.0], "persistence": [1, 3], "volume_ma": [5, 20]}
+    batch = Backtester(market, config).run_batch(predictions, grid)
+    assert len(batch) == len(predictions)*8
+    for row in batch.to_dict("records"):
+        backtester = Backtester(frames(market, predictions)[row["Strategy"]], config)
+        backtester.hysteresis, backtester.persistence, backtester.volume_ma = row["Hysteresis"], row["Persistence"], row["Volume_MA"]
+        df = backtester.run_strategy({"ind_t": "RF", "ind_p": [50, 5, 5]})
+        expected = Result.from_frame({"ind_t": "RF", "ind_p": [50, 5, 5]}, df)
+        for key in METRICS:
+            assert row[key] == pytest.approx(expected[key], rel=1e-12)
+        assert row["Volume_Strength"] == pytest.approx(df["Volume_Strength"].iloc[-1])
+
+
+def test_state_matches_run_strategy(config, market, predictions):
+    indicator = {"ind_t": "RF", "ind_p": [50, 5, 5]}
+    for df in frames(market, predictions):
+        backtester = Backtester(df, config)
+        state = backtester.init_state().update_frame(df)
+        df = backtester.run_strategy(indicator)
+        expected = Result.from_frame(indicator, df)
+        for key, value in state.metrics().items():
+            assert value == pytest.approx(expected[key], rel=1e-9)
+        assert state.signal == df["Signal"].iloc[-1]
+        assert state.signal_length == df["Signal_Length"].iloc[-1]
+        assert state.volume_strength == pytest.approx(df["Volume_Strength"].iloc[-1])
+
+
+def test_state_resumes_from_saved_state(config, market, predictions, tmp_path):
+    df    = frames(market, predictions)[0]
+    path  = str(tmp_path / "state" / "AAA.json")
+    first = Backtester(df.iloc[:100], config).run_state(path, version=1)
+    assert first.n == 100
+    
+    # only new samples are added to the saved state (same metrics as a full pass)
+    state = Backtester(df, config).run_state(path, version=1)
+    full  = Backtester(df, config).init_state(version=1).update_frame(df)
+    assert state.n == len(df)
+    assert state.metrics() == pytest.approx(full.metrics())
+    
+    # state of another model version starts over
+    assert Backtester(df.iloc[:50], config).load_state(path, version=2).n == 0
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from core.forecaster import Forecaster
+
+
+@pytest.mark.parametrize("method", ["RF", "ET", "GB", "KN"])
+def test_family_matches_single_models(config, market, method):
+    # nested parameter varies, the model of the largest one gives the predictions of all
+    n = Forecaster.NESTED[method]
+    indicators = []
+    for size in [3, 5, 8]:
+        params = [10, 3, 4]
+        params[n] = size
+        indicators.append({"ind_t": method, "ind_p": params})
+    assert Forecaster.families(indicators) == [indicators]
+    
+    dfs = Forecaster(indicators[0], market, config, features={}).predictions_family(indicators)
+    for indicator, df in zip(indicators, dfs):
+        expected = Forecaster(indicator, market, config).predictions()["Predicted_Close"]
+        np.testing.assert_allclose(df["Predicted_Close"], expected, rtol=1e-12)
+
+
+def test_arima_single_pass_matches_stepwise_forecasts(config, market):
+    # one filter pass over test data equals one-step forecasts after each new sample (fixed parameters)
+    indicator  = {"ind_t": "ARIMA", "ind_p": [1, 1, 1]}
+    forecaster = Forecaster(indicator, market, config)
+    pred = forecaster.predictions()["Predicted_Close"].to_numpy()
+    
+    y, N  = market["Close"], forecaster.N
+    model = forecaster.fitted
+    for k in range(N, N +10):
+        assert pred[k] == pytest.approx(float(np.asarray(model.forecast()).ravel()[0]), rel=1e-8)
+        model = model.append(y.iloc[k:k +1].values, refit=False)
+    assert np.isnan(pred[:N]).all()
+
+
+@pytest.mark.parametrize("method", ["RF", "ET", "GB", "KN"])
+def test_family_fitted_matches_single_models(config, market, method):
+    # trained model kept for each indicator of a family predicts as the model trained alone
+    n = Forecaster.NESTED[method]
+    indicators = []
+    for size in [3, 8]:
+        params = [10, 3, 4]
+        params[n] = size
+        indicators.append({"ind_t": method, "ind_p": params})
+    
+    forecaster = Forecaster(indicators[0], market, config)
+    forecaster.predictions_family(indicators)
+    X = np.lib.stride_tricks.sliding_window_view(market["Close"].to_numpy(), 4)
+    for indicator, fitted in zip(indicators, forecaster.family_fitted):
+        single = Forecaster(indicator, market, config)
+        single.predictions()
+        np.testing.assert_allclose(fitted.predict(X), single.fitted.predict(X), rtol=1e-12)
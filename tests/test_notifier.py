@@ -0,0 +1,62 @@
+import json, threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from core.notifier import Notifier
+
+
+@pytest.fixture
+def telegram(monkeypatch):
+    # local stand-in of the Telegram API: replies with status codes of `codes` (then 200), records received messages
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+    server.codes, server.received = [], []
+    lock = threading.Lock()
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with lock:
+                code = server.codes.pop(0) if server.codes else 200
+                if code == 200:
+                    server.received.append((payload["chat_id"], payload["text"].splitlines()[-1]))
+                body = {"result": {"message_id": len(server.received)}} if code == 200 else {"parameters": {"retry_after": 0}}
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def log_message(self, *args):
+            pass
+    
+    server.RequestHandlerClass = Handler
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("TELEGRAM_API", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv("CHAT_ID", "@main")
+    yield server
+    server.shutdown()
+
+
+def test_messages_in_order_within_each_chat(telegram):
+    notifier = Notifier(backoff=0)
+    msgs     = [f"m{k}" for k in range(6)]
+    msg_ids  = notifier.send_telegram_many(msgs, ["@a", "@b", "@a", "@b", "@a", "@a"])
+    
+    assert [text for chat, text in telegram.received if chat == "@a"] == ["m0", "m2", "m4", "m5"]
+    assert [text for chat, text in telegram.received if chat == "@b"] == ["m1", "m3"]
+    assert [telegram.received[k -1][1] for k in msg_ids] == msgs
+    assert notifier.send_telegram_many(["x", "y"]) == [7, 8]
+    assert telegram.received[-2:] == [("@main", "x"), ("@main", "y")]
+
+
+def test_retry_when_rate_limited(telegram):
+    telegram.codes = [429, 503]
+    assert Notifier(backoff=0).send_telegram("alert") == 1
+    assert telegram.received == [("@main", "alert")]
+
+
+def test_failure_returns_none(telegram):
+    telegram.codes = [500]*4 +[400]
+    notifier = Notifier(retries=3, backoff=0)
+    assert notifier.send_telegram("lost") is None
+    assert notifier.send_telegram("rejected") is None      # client errors are not retried
+    assert notifier.send_telegram("sent") == 1
@@ -0,0 +1,26 @@
+from core.backtester import Result
+from core.strategies import Strategies
+
+
+def records(ticker, n):
+    return [(f"{ticker}_RF_{k}", Result(Indicator="RF", Parameters=[k], Return_Strategy=1 +k/10, Sharpe=k)) for k in range(n)]
+
+
+def test_ranking_independent_of_arrival_order():
+    # jobs finishing in another order (e.g. worker processes) give the same tickers and rankings as the grid order
+    grid = [("AAA", records("AAA", 3)), ("BBB", records("BBB", 3))]
+    serial, parallel = Strategies().ranking(compare=True), Strategies().ranking(compare=True)
+    position = 0
+    for ticker, recs in grid:
+        serial.extend(ticker, recs, range(position, position +len(recs)))
+        position += len(recs)
+    for ticker, recs in [grid[1], grid[0]]:
+        start = 0 if ticker == "AAA" else 3
+        parallel.extend(ticker, reversed(recs), reversed(range(start, start +len(recs))))
+    
+    assert parallel.tickers() == serial.tickers() == ["AAA", "BBB"]
+    for preset in serial.names:
+        best, expected = parallel.best(preset), serial.best(preset)
+        assert list(best) == list(expected)
+        for ticker in expected:
+            assert best[ticker].equals(expected[ticker])